@@ -17,6 +17,20 @@ module.exports = {
         // Scraper (optionnel)
         MAX_PAGE: "50"
       }
+    },
+    {
+      // Scraper résident: crawls planifiés avec reprise, statut sur http://127.0.0.1:8765/status
+      name: "licitor-scraper",
+      cwd: "/var/www/immo/app/python",
+      script: "python3",
+      args: "-m licitor.daemon --every 6h --incremental",
+      interpreter: "none",
+      autorestart: true,
+      kill_timeout: 60000, // laisse le crawl finir sa page et écrire son point de reprise
+      env: {
+        MAX_PAGE: "50",
+        SCRAPER_STATUS_PORT: "8765"
+      }
     }
   ]
 };
@@ -0,0 +1,144 @@
+"""Benchmark des moteurs d'extraction débit/crédit de debit_gui.py sur un relevé synthétique.
+
+Génère un relevé PDF de N pages (en-tête "DATE LIBELLE VALEUR DEBIT CREDIT", montants alignés à droite
+dans leur colonne, séparateur de milliers, crédits seuls sur leur ligne, solde reporté en haut de page)
+dont les totaux exacts sont connus, dans trois variantes:
+  - "entete": en-tête répété sur chaque page, milliers séparés par des espaces ("1 234,56");
+  - "page1": en-tête sur la première page seulement (colonnes en cache pour les suivantes);
+  - "points": milliers séparés par des points ("1.234,56");
+  - "polices": en-tête en page 1 seulement et libellés en corps 10 (montants en corps 9) sur la même ligne.
+Puis compare sur chaque variante:
+  - "texte": extract_text() puis ordre des montants dans chaque ligne (un montant seul = débit);
+  - "mots": mots lus sur la mise en page pdfminer (debit_gui.mots_page) et colonnes repérées par position
+    sur la ligne d'en-tête.
+Pour chaque moteur: pages/s (médiane) et écart des totaux débit/crédit à la vérité.
+
+Usage: python bench/bench_debit.py [--pages 200] [--repeat 3] [--keep dossier]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from debit_gui import extraire_debits  # noqa: E402
+
+# Colonnes du relevé (points), police Helvetica 9: ~5 pt par chiffre
+X_DATE, X_LIBELLE, X_VALEUR, X_DEBIT_FIN, X_CREDIT_FIN = 40, 90, 330, 455, 545
+LARGEUR_CAR = 5.0
+# Variante -> (en-tête sur chaque page, séparateur de milliers, corps des libellés)
+VARIANTES = {"entete": (True, " ", 9), "page1": (False, " ", 9), "points": (True, ".", 9), "polices": (False, " ", 10)}
+
+
+def _montant(centimes: int, milliers: str = " ") -> str:
+    euros = f"{centimes // 100:,}".replace(",", milliers)
+    return f"{euros},{centimes % 100:02d}"
+
+
+def releve_synthetique(pages: int, lignes: int = 40, seed: int = 0, entete_partout: bool = True,
+                       milliers: str = " ", corps_libelle: int = 9) -> tuple[list[list[tuple]], float, float]:
+    """Contenu des pages [(x, y, texte[, corps])] et totaux exacts (débits, crédits)."""
+    rnd = random.Random(seed)
+    contenu = []
+    total_d = total_c = 0
+    solde = 1_000_000
+    for p in range(pages):
+        items = [(X_DATE, 800, "RELEVE DE COMPTE - PAGE"), (X_LIBELLE + 120, 800, str(p + 1))]
+        # Solde reporté au-dessus de l'en-tête: ne doit compter ni en débit ni en crédit
+        report = _montant(solde, milliers)
+        items += [(X_DATE, 785, "SOLDE REPORTE"), (X_CREDIT_FIN - len(report) * LARGEUR_CAR, 785, report)]
+        if entete_partout or p == 0:
+            items += [(X_DATE, 765, "DATE"), (X_LIBELLE, 765, "LIBELLE"), (X_VALEUR, 765, "VALEUR"),
+                      (X_DEBIT_FIN - 27, 765, "DEBIT"), (X_CREDIT_FIN - 33, 765, "CREDIT")]
+        for r in range(lignes):
+            y = 745 - r * 17
+            jour = f"{r % 28 + 1:02d}"
+            centimes = rnd.randint(100, 500_000)
+            items += [(X_DATE, y, f"{jour}.06"), (X_LIBELLE, y, f"PRLV SEPA OPERATION {p}-{r}", corps_libelle),
+                      (X_VALEUR, y, f"{jour}.06.25")]
+            texte = _montant(centimes, milliers)
+            if rnd.random() < 0.3:
+                items.append((X_CREDIT_FIN - len(texte) * LARGEUR_CAR, y, texte))
+                total_c += centimes
+                solde += centimes
+            else:
+                items.append((X_DEBIT_FIN - len(texte) * LARGEUR_CAR, y, texte))
+                total_d += centimes
+                solde -= centimes
+        contenu.append(items)
+    contenu[-1].append((X_DATE, 40, "SOLDE EN EUROS"))
+    return contenu, total_d / 100, total_c / 100
+
+
+def _echapper(texte: str) -> str:
+    return texte.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def ecrire_pdf(chemin: str, contenu: list[list[tuple]]) -> None:
+    """PDF minimal (Helvetica, corps 9 par défaut, une page A4 par liste de textes positionnés), sans dépendance."""
+    objets = [b"<< /Type /Catalog /Pages 2 0 R >>", b"",
+              b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for items in contenu:
+        lignes = []
+        for item in items:
+            x, y, t = item[:3]
+            corps = item[3] if len(item) > 3 else 9
+            lignes.append(f"/F1 {corps} Tf 1 0 0 1 {x:.2f} {y} Tm ({_echapper(t)}) Tj\n")
+        flux = "BT\n" + "".join(lignes) + "ET"
+        data = flux.encode("cp1252")
+        objets.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        objets.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >>"
+                      b" /Contents %d 0 R >>" % len(objets))
+        kids.append(len(objets))
+    objets[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    positions = []
+    for i, obj in enumerate(objets, 1):
+        positions.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objets) + 1)
+    out += b"".join(b"%010d 00000 n \n" % p for p in positions)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objets) + 1, xref)
+    with open(chemin, "wb") as f:
+        f.write(out)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pages", type=int, default=200, help="pages du relevé synthétique (défaut 200)")
+    ap.add_argument("--repeat", type=int, default=3, help="répétitions par moteur (défaut 3)")
+    ap.add_argument("--keep", default="", help="conserver les PDF générés dans ce dossier")
+    args = ap.parse_args()
+
+    dossier = args.keep or tempfile.mkdtemp(prefix="bench-debit-")
+    os.makedirs(dossier, exist_ok=True)
+    print(f"{'variante':<8} {'moteur':<8} {'pages/s':>9} {'médiane':>9} {'écart débits':>14} {'écart crédits':>14}")
+    for variante, (entete_partout, milliers, corps) in VARIANTES.items():
+        contenu, vrai_d, vrai_c = releve_synthetique(args.pages, entete_partout=entete_partout, milliers=milliers,
+                                                     corps_libelle=corps)
+        chemin = os.path.join(dossier, f"releve-{variante}.pdf")
+        ecrire_pdf(chemin, contenu)
+        for moteur in ("texte", "mots"):
+            temps = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                debits, credits = extraire_debits(chemin, moteur=moteur)
+                temps.append(time.perf_counter() - start)
+            med = statistics.median(temps)
+            # round(...) or 0.0: pas de "-0.00" pour un écart nul aux erreurs d'arrondi près
+            ecart_d = round(sum(d for d in debits if d is not None) - vrai_d, 2) or 0.0
+            ecart_c = round(sum(c for c in credits if c is not None) - vrai_c, 2) or 0.0
+            print(f"{variante:<8} {moteur:<8} {args.pages / med:>9.1f} {med:>8.2f}s {ecart_d:>14.2f} {ecart_c:>14.2f}")
+        if not args.keep:
+            os.remove(chemin)
+    if not args.keep:
+        os.rmdir(dossier)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Micro-benchmark du coût CPU par page détail.
+
+Compare, sur une page synthétique proche d'une fiche Licitor (ou sur des fichiers HTML passés en argument):
+  - "séparé / html.parser": parsing html.parser puis extract_coords / extract_full_text /
+    extract_additional_fields appelés chacun seul (un parcours et une sérialisation par extracteur,
+    comme avant l'introduction de parse_detail);
+  - "passe unique / <parser>": parse_detail(), un parsing, un parcours, une sérialisation.
+
+Usage: python bench/bench_parse.py [-n 200] [fichier.html ...]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from licitor.extract import PARSER, extract_additional_fields, extract_coords, extract_full_text, parse_detail
+
+DETAIL_URL = "https://www.licitor.com/annonce/10/12/34/vente-aux-encheres/un-appartement/paris-6eme/paris/104567.html"
+
+
+def synthetic_detail_page(n_links: int = 250, n_paragraphs: int = 40) -> str:
+    nav = "".join(f'<li><a href="/ventes/{i}.html" class="Nav">Rubrique {i}</a></li>' for i in range(n_links))
+    paras = "".join(
+        f"<p>Paragraphe {i} : au {i % 7}ème étage, appartement de {i % 5 + 1} pièces, cave et parking. "
+        f"Lot n°{i} occupé.</p>"
+        for i in range(n_paragraphs)
+    )
+    return f"""<!DOCTYPE html><html><head><title>Vente aux enchères</title>
+<script type="application/ld+json">{{"@type": "Place", "name": "Vente"}}</script>
+<script>var x = {{"a": 1}}; function init() {{ return 1; }}</script></head>
+<body><header><ul class="Menu">{nav}</ul></header>
+<div class="AdContent">
+  <div class="MainPhoto"><img src="https://www.licitor.com/photos/104567.jpg" alt=""></div>
+  <p class="Date">jeudi 9 octobre 2025 à 14h</p>
+  <div class="Location"><p class="City">Paris 6ème</p><p class="Street">6, rue de l'Abbaye</p></div>
+  <div class="SousLot"><h2>Un appartement</h2><p>au 3ème étage, comprenant : entrée, séjour, deux chambres</p></div>
+  <div class="SousLot"><h2>Une cave</h2><p>au sous-sol, Lot n°46</p></div>
+  <div class="Text">Un appartement
+au 3ème étage
+
+comprenant : entrée, séjour, deux chambres
+Surface totale Carrez de 65,47 m²</div>
+  <p>Visite sur place vendredi 26 septembre 2025 de 13h à 14h par huissier</p>
+  <div class="Court">Tribunal Judiciaire de Paris</div>
+  <div class="AdditionalText">Le cahier des conditions de vente est déposé au Greffe du Tribunal Judiciaire de Paris</div>
+  <div class="Trusts"><div class="Trust">Maître Dupont, avocat au barreau de Paris</div></div>
+  {paras}
+  <iframe src="https://www.google.com/maps/embed?q=48.854191,2.335319"></iframe>
+</div>
+<footer><p>Ferrari &amp; Cie - Réf. A25/0369</p></footer></body></html>"""
+
+
+def separate_extractors(html_text: str) -> None:
+    soup = BeautifulSoup(html_text, "html.parser")
+    soup.select_one(".Street")
+    soup.select_one(".MainPhoto img")
+    soup.find(string=lambda t: t and "Visite" in t)
+    soup.select_one(".Date")
+    extract_coords(soup)
+    extract_full_text(soup)
+    extract_additional_fields(soup, DETAIL_URL)
+
+
+def single_pass(html_text: str) -> None:
+    parse_detail(html_text, DETAIL_URL)
+
+
+def _time_per_page(func, pages: list[str], rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        for html_text in pages:
+            start = time.perf_counter()
+            func(html_text)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", "--rounds", type=int, default=200)
+    ap.add_argument("files", nargs="*", help="pages détail HTML enregistrées (défaut: page synthétique)")
+    args = ap.parse_args()
+
+    if args.files:
+        pages = []
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                pages.append(f.read())
+    else:
+        pages = [synthetic_detail_page()]
+    rounds = max(1, args.rounds // len(pages))
+    print(f"{len(pages)} page(s), {sum(len(p) for p in pages) // len(pages) // 1024} Ko en moyenne, {rounds} tours")
+
+    results = []
+    for label, func in (("séparé / html.parser", separate_extractors), (f"passe unique / {PARSER}", single_pass)):
+        func(pages[0])  # échauffement
+        samples = _time_per_page(func, pages, rounds)
+        med = statistics.median(samples)
+        results.append(med)
+        print(f"{label:<28} médiane {med * 1000:7.2f} ms/page   {1 / med:7.1f} pages/s")
+    print(f"Gain: x{results[0] / results[1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
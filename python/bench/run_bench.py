@@ -0,0 +1,248 @@
+"""Suite de benchmarks hors ligne du scraper (aucun accès à licitor.com).
+
+Cas mesurés:
+  - extracteurs (extract_coords, extract_full_text, extract_additional_fields, parse_detail) et parsing
+    de page de liste, sur les pages HTML de bench/fixtures/ -> pages/s. Ces pages sont synthétiques: écrites
+    à la main d'après la structure des pages Licitor (classes, JSON-LD, iframes et scripts de carte) pour
+    couvrir chaque chemin des extracteurs, pas enregistrées sur le site. Les débits servent à comparer
+    deux versions du code entre elles, pas à estimer le temps de parsing d'une vraie page; pour cela,
+    passer des pages réellement enregistrées à bench/bench_parse.py;
+  - _key_for et _merge_items sur des jeux synthétiques de 10k à 100k fiches -> fiches/s;
+  - champs normalisés (licitor.features) de 10k à 300k fiches: calcul complet, puis passe incrémentale
+    où 1% des fiches ont changé -> fiches/s (cas ignorés si pandas est absent);
+  - index spatial SQLite (ListingStore.within_bbox / nearest) sur 10k à 100k annonces -> requêtes/s.
+Pour chaque cas: débit (médiane de plusieurs répétitions) et pic mémoire (tracemalloc, passe séparée).
+
+Régressions: --save-baseline enregistre les résultats dans bench/baseline.json (propre à la machine);
+les runs suivants comparent à ce fichier et sortent en code 1 si un débit baisse de plus de --threshold %
+ou si un pic mémoire augmente de plus de --threshold %.
+
+Usage: python bench/run_bench.py [--quick] [--only merge] [--save-baseline] [--threshold 25]
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from licitor.extract import (  # noqa: E402
+    _scan_detail,
+    extract_additional_fields,
+    extract_coords,
+    extract_full_text,
+    parse_detail,
+    parse_html,
+)
+from licitor import crawler, features  # noqa: E402
+from licitor.store import ListingStore  # noqa: E402
+
+FIXTURES = os.path.join(HERE, "fixtures")
+BASELINE = os.path.join(HERE, "baseline.json")
+DETAIL_URL = "https://www.licitor.com/annonce/10/12/34/vente-aux-encheres/un-appartement/paris-6eme/paris/{n}.html"
+
+
+def _load_fixtures() -> tuple[list[str], list[str]]:
+    details, listings = [], []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            (listings if os.path.basename(path).startswith("listing") else details).append(f.read())
+    return details, listings
+
+
+def synthetic_records(n: int, seed: int = 0) -> list[dict]:
+    """Fiches au format du scraper; ~5% sans Number (clé URL) et ~1% sans Number ni lien (clé de repli)."""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        num = str(100000 + i)
+        r = rnd.random()
+        out.append({
+            "ville": f"Paris {i % 20 + 1}ème",
+            "description": "Un appartement",
+            "texte": "au 3ème étage, comprenant : entrée, séjour, deux chambres " * rnd.randint(1, 8),
+            "mise_a_prix": f"{rnd.randint(20, 3000) * 1000:,} €".replace(",", " "),
+            "adresse": f"{i % 200}, rue de Rivoli",
+            "photo": "",
+            "date_visite": "Visite sur place lundi 1er septembre 2025 de 10h à 11h",
+            "date_vente": f"jeudi {i % 28 + 1} octobre 2025 à 14h",
+            "latitude": f"{48.8 + rnd.random() / 10:.6f}",
+            "longitude": f"{2.25 + rnd.random() / 5:.6f}",
+            "AdditionalText": "" if r < 0.3 else "Le cahier des conditions de vente est déposé au greffe",
+            "Court": "Tribunal Judiciaire de Paris",
+            "SousLot": "Un appartement | Une cave",
+            "FirstSousLot": "Un appartement",
+            "Trusts": "Maître Dupont",
+            "Number": "" if r < 0.06 else num,
+            "lien": "" if r < 0.01 else DETAIL_URL.format(n=num),
+        })
+    return out
+
+
+def _feature_records(n: int, seed: int = 0) -> list[dict]:
+    """synthetic_records() avec les formulations du site: surface, lots, occupation, pied de page."""
+    rnd = random.Random(seed)
+    occupations = ("Occupée", "Apparemment libre", "Le bien est loué", "")
+    recs = synthetic_records(n, seed)
+    for i, r in enumerate(recs):
+        r["FirstSousLot"] = (f"Un appartement de {rnd.randint(9, 250)},{rnd.randint(0, 99):02d} m²\n"
+                             f"(Lot n°{i % 90 + 1})\n{occupations[i % 4]}")
+        r["texte"] = "Nouveau\xa0!\n" + r["texte"] + "\n🔎︎ 5.162\xa0\xa0\xa0\xa0❤ 200\nFerrari Conseil S.A."
+    return recs
+
+
+def _measure(func, units: int, repeat: int) -> dict:
+    """Débit médian sur `repeat` exécutions, puis une exécution sous tracemalloc pour le pic mémoire."""
+    func()  # échauffement
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    med = statistics.median(times)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"units": units, "median_s": round(med, 6), "throughput": round(units / med, 1), "peak_kb": peak // 1024}
+
+
+def _cases(quick: bool, resources: contextlib.ExitStack) -> dict:
+    """Cas à mesurer. Les bases SQLite des cas géographiques vivent dans un dossier temporaire
+    fermé et supprimé par `resources` à la fin du run.
+    """
+    details, listings = _load_fixtures()
+    if not details or not listings:
+        sys.exit(f"Fixtures manquantes dans {FIXTURES}")
+    urls = [DETAIL_URL.format(n=104500 + i) for i in range(len(details))]
+    soups = [parse_html(h) for h in details]
+    htmls = [s.decode() for s in soups]
+    scans = [_scan_detail(s) for s in soups]
+
+    def each_detail(fn):
+        return lambda: [fn(i) for i in range(len(details))]
+
+    cases = {
+        # Extracteurs seuls (arbre déjà parsé, chacun refait son parcours comme lors d'un appel isolé)
+        "extract_coords": ("pages", len(details), each_detail(lambda i: extract_coords(soups[i]))),
+        "extract_full_text": ("pages", len(details), each_detail(lambda i: extract_full_text(soups[i]))),
+        "extract_additional_fields": (
+            "pages", len(details), each_detail(lambda i: extract_additional_fields(soups[i], urls[i]))),
+        # Extracteurs avec parcours et HTML partagés (chemin de parse_detail)
+        "extractors_shared_scan": ("pages", len(details), each_detail(lambda i: (
+            extract_coords(soups[i], html=htmls[i], scan=scans[i]),
+            extract_full_text(soups[i], scan=scans[i]),
+            extract_additional_fields(soups[i], urls[i], html=htmls[i], scan=scans[i]),
+        ))),
+        # Chaîne complète depuis le HTML brut
+        "parse_detail": ("pages", len(details), each_detail(lambda i: parse_detail(details[i], urls[i]))),
+        "listing_page": ("pages", len(listings), lambda: [
+            [crawler._parse_card(c) for c in parse_html(h).select("ul.AdResults > li")] for h in listings
+        ]),
+    }
+    sizes = (10_000,) if quick else (10_000, 100_000)
+    for n in sizes:
+        existing = synthetic_records(n, seed=1)
+        # Nouveau run: 20% de fiches déjà connues (modifiées) + 10% de nouvelles
+        new_items = [dict(it, texte=it["texte"] + " (mis à jour)") for it in existing[: n // 5]]
+        new_items += synthetic_records(n // 10, seed=2)
+        for it in new_items[n // 5:]:
+            it["Number"] = str(int(it["Number"] or 0) + 10_000_000) if it["Number"] else ""
+        cases[f"key_for_{n // 1000}k"] = ("records", n, lambda recs=existing: [crawler._key_for(r) for r in recs])
+        cases[f"merge_items_{n // 1000}k"] = (
+            "records", n + len(new_items), lambda e=existing, ni=new_items: crawler._merge_items(e, ni))
+    workdir = resources.enter_context(tempfile.TemporaryDirectory(prefix="bench-geo-"))
+    for n in sizes:
+        store = ListingStore(os.path.join(workdir, f"listings-{n}.db"), crawler._key_for)
+        resources.callback(store.close)
+        store.upsert_many(synthetic_records(n, seed=4), crawler._merge_record)
+        rnd = random.Random(5)
+        points = [(48.8 + rnd.random() / 10, 2.25 + rnd.random() / 5) for _ in range(200)]
+        cases[f"geo_bbox_{n // 1000}k"] = ("queries", len(points), lambda st=store, pts=points: [
+            st.within_bbox(lat - 0.002, lon - 0.003, lat + 0.002, lon + 0.003) for lat, lon in pts])
+        cases[f"geo_nearest_{n // 1000}k"] = ("queries", len(points), lambda st=store, pts=points: [
+            st.nearest(lat, lon, k=5) for lat, lon in pts])
+    if features.pd is not None:
+        for n in (10_000,) if quick else (10_000, 100_000, 300_000):
+            recs = _feature_records(n, seed=3)
+            cases[f"features_full_{n // 1000}k"] = (
+                "records", n, lambda r=recs: features.apply_features([dict(it) for it in r]))
+            done = [dict(it) for it in recs]
+            features.apply_features(done)
+            touched = range(0, n, 100)
+
+            def incremental(done=done, touched=touched):
+                batch = done[:]
+                for i in touched:
+                    batch[i] = dict(batch[i], mise_a_prix=batch[i]["mise_a_prix"] + " ")
+                return features.apply_features(batch)
+
+            cases[f"features_incr_{n // 1000}k"] = ("records", n, incremental)
+    return cases
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--quick", action="store_true", help="moins de répétitions, jeux de 10k seulement")
+    ap.add_argument("--only", default="", help="ne lancer que les cas dont le nom contient cette chaîne")
+    ap.add_argument("--repeat", type=int, default=0, help="répétitions par cas (défaut: 5, 3 en --quick)")
+    ap.add_argument("--threshold", type=float, default=25.0, help="régression tolérée, en %% (défaut 25)")
+    ap.add_argument("--save-baseline", action="store_true", help=f"enregistrer les résultats dans {BASELINE}")
+    ap.add_argument("--json", default="", help="écrire aussi les résultats dans ce fichier")
+    args = ap.parse_args()
+    repeat = args.repeat or (3 if args.quick else 5)
+
+    baseline = {}
+    if os.path.exists(BASELINE) and not args.save_baseline:
+        with open(BASELINE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'cas':<28} {'débit':>14} {'médiane':>10} {'pic mém.':>10}   vs référence")
+    with contextlib.ExitStack() as resources:
+        for name, (unit, units, func) in _cases(args.quick, resources).items():
+            if args.only and args.only not in name:
+                continue
+            res = _measure(func, units, repeat)
+            res["unit"] = unit
+            results[name] = res
+            cmp = ""
+            ref = baseline.get(name)
+            if ref:
+                speed = (res["throughput"] / ref["throughput"] - 1) * 100
+                mem = (res["peak_kb"] / max(ref["peak_kb"], 1) - 1) * 100
+                cmp = f"débit {speed:+.0f}%  mém. {mem:+.0f}%"
+                if speed < -args.threshold:
+                    regressions.append(f"{name}: débit {speed:+.0f}%")
+                if mem > args.threshold and res["peak_kb"] - ref["peak_kb"] > 256:
+                    regressions.append(f"{name}: mémoire {mem:+.0f}%")
+            print(f"{name:<28} {res['throughput']:>9.1f} {unit + '/s':<4} {res['median_s'] * 1000:>8.1f}ms "
+                  f"{res['peak_kb']:>8} Ko   {cmp}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Référence enregistrée: {BASELINE}")
+    elif not baseline:
+        print("Pas de référence: lancer avec --save-baseline pour activer la détection de régressions.")
+    if regressions:
+        print(f"RÉGRESSIONS (seuil {args.threshold:g}%):")
+        for r in regressions:
+            print(f"  - {r}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,51 @@ import re
 import pdfplumber
 import os
 
-def extraire_debits(pdf_path):
-    texte = ""
+# Montant "1234,56" ou "-1234,56" (débit si signe moins)
+MONTANT_RE = re.compile(r'-?\d+,\d{2}')
+
+
+def iter_pages(pdf_path):
+    """Texte de chaque page, une page à la fois: (numéro de page, texte).
+    Le cache de la page (caractères, objets, carte du texte) est libéré dès qu'elle est lue,
+    la mémoire reste donc stable quelle que soit la longueur du relevé.
+    """
     with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            texte += page.extract_text() + "\n"
-    # Extraction des montants négatifs (débits)
-    debits = [float(x.replace(',', '.')) for x in re.findall(r'-?\d+,\d{2}', texte) if '-' in x]
-    return debits
+        for num, page in enumerate(pdf.pages, 1):
+            try:
+                # extract_text() peut renvoyer None (page vide ou scannée)
+                texte = page.extract_text() or ""
+            finally:
+                page.close()
+            yield num, texte
+
+
+def page_transactions(num, texte):
+    """Montants d'une page: {"page", "ligne", "montant", "debit"}."""
+    if not MONTANT_RE.search(texte):
+        return
+    for ligne in texte.splitlines():
+        for m in MONTANT_RE.finditer(ligne):
+            x = m.group()
+            yield {"page": num, "ligne": ligne, "montant": float(x.replace(',', '.')), "debit": x.startswith('-')}
+
+
+def iter_transactions(pdf_path):
+    """Montants du relevé au fil des pages."""
+    for num, texte in iter_pages(pdf_path):
+        yield from page_transactions(num, texte)
+
+
+def iter_debits(pdf_path):
+    # Montants négatifs (débits), page par page
+    for t in iter_transactions(pdf_path):
+        if t["debit"]:
+            yield t["montant"]
+
+
+def extraire_debits(pdf_path):
+    return list(iter_debits(pdf_path))
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -22,7 +59,7 @@ if __name__ == "__main__":
         print("Le fichier fourni n'est pas un PDF valide.")
         input("Appuyez sur Entrée pour quitter...")
         sys.exit(1)
-    debits = extraire_debits(pdf_path)
-    somme = sum(debits)
+    # Somme au fil de l'eau: aucune liste de montants n'est conservée
+    somme = sum(iter_debits(pdf_path))
     print(f"Somme des débits : {somme:.2f} €")
-    input("Appuyez sur Entrée pour quitter...")
\ No newline at end of file
+    input("Appuyez sur Entrée pour quitter...")
@@ -0,0 +1,213 @@
+"""Traitement par lot de relevés PDF, sans aucune question posée (utilisable en tâche planifiée).
+
+    python debit_batch.py RELEVES/ "2025/**/*.pdf" releve.pdf [--workers 4] [--out releves] [--no-cache]
+
+- Entrées: dossiers (tous les PDF, sous-dossiers compris), motifs glob ou fichiers.
+- Les PDF sont analysés en parallèle dans un pool de processus (extraction de debit.py, page par page).
+- Cache par contenu: le résultat de chaque PDF est rangé sous l'empreinte SHA-256 de ses octets;
+  un fichier inchangé (même renommé ou déplacé) n'est pas ré-analysé.
+- Sorties consolidées: <out>.csv (une ligne par montant), <out>_totaux.csv (totaux par fichier et total
+  général) et <out>.json (les deux). Code de sortie 1 si un fichier n'a pas pu être analysé.
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import debit
+from licitor.output import atomic_open
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# À incrémenter quand l'extraction change: les résultats en cache deviennent alors invalides
+CACHE_VERSION = 1
+CHAMPS = ["fichier", "page", "ligne", "montant", "debit"]
+CHAMPS_TOTAUX = ["fichier", "sha256", "pages", "montants", "debits", "total_debits", "cache", "erreur"]
+
+
+def lister_pdfs(entrees):
+    """Dossiers, motifs glob et fichiers -> chemins de PDF uniques, triés."""
+    chemins = set()
+    for entree in entrees:
+        if os.path.isdir(entree):
+            trouves = glob.glob(os.path.join(glob.escape(entree), "**", "*"), recursive=True)
+        elif glob.has_magic(entree):
+            trouves = glob.glob(entree, recursive=True)
+        else:
+            trouves = [entree]
+        for chemin in trouves:
+            if chemin.lower().endswith(".pdf") and os.path.isfile(chemin):
+                chemins.add(os.path.abspath(chemin))
+    return sorted(chemins)
+
+
+def empreinte(chemin):
+    h = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def analyser(chemin):
+    """Exécuté dans un processus du pool: montants et totaux d'un PDF."""
+    transactions = []
+    pages = 0
+    for num, texte in debit.iter_pages(chemin):
+        pages = num
+        transactions.extend(debit.page_transactions(num, texte))
+    debits = [t["montant"] for t in transactions if t["debit"]]
+    return {
+        "pages": pages,
+        "montants": len(transactions),
+        "debits": len(debits),
+        "total_debits": round(sum(debits), 2),
+        "transactions": transactions,
+    }
+
+
+class Cache:
+    """Un fichier JSON par PDF analysé: <dossier>/v<version>-<sha256>.json."""
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+
+    def _chemin(self, sha):
+        return os.path.join(self.dossier, f"v{CACHE_VERSION}-{sha}.json")
+
+    def lire(self, sha):
+        try:
+            with open(self._chemin(sha), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def ecrire(self, sha, resultat):
+        # Résultat reconstructible (ré-analyse du PDF): remplacement atomique sans fsync
+        with atomic_open(self._chemin(sha), fsync=False) as f:
+            json.dump(resultat, f, ensure_ascii=False)
+
+
+def traiter(chemins, workers=None, cache=None):
+    """Analyse les PDF (cache d'abord, puis pool de processus). Retourne les résultats par fichier,
+    dans l'ordre de `chemins`.
+    """
+    resultats = {}
+    a_analyser = {}
+    for chemin in chemins:
+        try:
+            sha = empreinte(chemin)
+        except OSError as e:
+            resultats[chemin] = {"sha256": "", "erreur": str(e)}
+            continue
+        res = cache.lire(sha) if cache else None
+        if res is not None:
+            resultats[chemin] = dict(res, sha256=sha, cache=True)
+            print(f"[cache] {chemin}")
+        else:
+            a_analyser[chemin] = sha
+    if a_analyser:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(analyser, chemin): chemin for chemin in a_analyser}
+            for fut in as_completed(futures):
+                chemin = futures[fut]
+                sha = a_analyser[chemin]
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    resultats[chemin] = {"sha256": sha, "erreur": f"{type(e).__name__}: {e}"}
+                    print(f"[erreur] {chemin} : {e}")
+                    continue
+                if cache:
+                    cache.ecrire(sha, res)
+                resultats[chemin] = dict(res, sha256=sha, cache=False)
+                print(f"[ok] {chemin} : {res['pages']} pages, {res['debits']} débits, {res['total_debits']:.2f} €")
+    return [(chemin, resultats[chemin]) for chemin in chemins]
+
+
+def ecrire_sorties(resultats, sortie):
+    """<sortie>.csv, <sortie>_totaux.csv et <sortie>.json. Retourne le total général."""
+    fichiers = []
+    for chemin, res in resultats:
+        ligne = {k: res.get(k, "") for k in CHAMPS_TOTAUX}
+        ligne["fichier"] = chemin
+        fichiers.append(ligne)
+    ok = [f for f in fichiers if not f["erreur"]]
+    total = {
+        "fichiers": len(fichiers),
+        "erreurs": len(fichiers) - len(ok),
+        "pages": sum(f["pages"] for f in ok),
+        "montants": sum(f["montants"] for f in ok),
+        "debits": sum(f["debits"] for f in ok),
+        "total_debits": round(sum(f["total_debits"] for f in ok), 2),
+    }
+
+    def transactions():
+        for chemin, res in resultats:
+            for t in res.get("transactions", ()):
+                yield dict(t, fichier=chemin)
+
+    def csv_transactions(f):
+        w = csv.DictWriter(f, fieldnames=CHAMPS, delimiter=";")
+        w.writeheader()
+        w.writerows(transactions())
+
+    def csv_totaux(f):
+        w = csv.DictWriter(f, fieldnames=CHAMPS_TOTAUX, delimiter=";")
+        w.writeheader()
+        w.writerows(fichiers)
+        w.writerow({"fichier": "TOTAL", "pages": total["pages"], "montants": total["montants"],
+                    "debits": total["debits"], "total_debits": total["total_debits"]})
+
+    def json_complet(f):
+        json.dump({
+            "genere_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "fichiers": fichiers,
+            "total": total,
+            "transactions": list(transactions()),
+        }, f, ensure_ascii=False, indent=1)
+
+    # Fichier temporaire du même dossier puis os.replace() (atomic_open): jamais de sortie à moitié écrite
+    for chemin, ecrire in ((sortie + ".csv", csv_transactions), (sortie + "_totaux.csv", csv_totaux),
+                           (sortie + ".json", json_complet)):
+        with atomic_open(chemin, newline="") as f:
+            ecrire(f)
+    return total
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Somme des débits de relevés PDF, par lot.")
+    ap.add_argument("entrees", nargs="+", help="dossiers, motifs glob (entre guillemets) ou fichiers PDF")
+    ap.add_argument("--workers", type=int, default=None, help="processus d'analyse (défaut: nombre de CPU)")
+    ap.add_argument("--out", default="releves", help="préfixe des fichiers de sortie (défaut: releves)")
+    ap.add_argument("--cache-dir", default=os.path.join(HERE, ".debit_cache"), help="dossier du cache")
+    ap.add_argument("--no-cache", dest="cache", action="store_false", help="tout ré-analyser")
+    args = ap.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        ap.error("--workers doit être au moins 1")
+
+    chemins = lister_pdfs(args.entrees)
+    if not chemins:
+        print("Aucun fichier PDF trouvé.")
+        return 1
+    t0 = time.perf_counter()
+    cache = Cache(args.cache_dir) if args.cache else None
+    resultats = traiter(chemins, workers=args.workers, cache=cache)
+    total = ecrire_sorties(resultats, args.out)
+    print(
+        f"{total['fichiers']} relevés ({total['pages']} pages) en {time.perf_counter() - t0:.1f}s: "
+        f"{total['debits']} débits, total {total['total_debits']:.2f} €"
+        + (f", {total['erreurs']} en erreur" if total["erreurs"] else "")
+    )
+    print(f"Écrit: {args.out}.csv, {args.out}_totaux.csv, {args.out}.json")
+    return 1 if total["erreurs"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,19 @@
+import logging
+import queue
+import sys
+import threading
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
 import pdfplumber
 import re
+from pdfminer.layout import LTChar, LTContainer
+
+# Traces détaillées (une par ligne de relevé): logger optionnel, activé par --debug
+log = logging.getLogger("debit_gui")
+
+ENTETE = "DATE LIBELLE VALEUR DEBIT CREDIT"
+FIN_RE = re.compile(r"INFORMATION PREALABLE|SOLDE EN EUROS")
+MONTANT_RE = re.compile(r"\d+,\d{2}")
 
 
 # Fonction d'extraction des débits
@@ -19,85 +31,353 @@ def extraire_debits_texte(texte):
     return debits
 
 
-def extraire_debits(pdf_path):
+def montants_page(texte, etat):
+    """Débits et crédits des lignes d'opérations d'une page.
+    `etat` est partagé entre les pages: "started" après la ligne d'en-tête, "arreter" à la fin du tableau.
+    """
+    debits = []
+    credits = []
+    for ligne in texte.splitlines():
+        l_upper = ligne.upper()
+        if not etat["started"]:
+            if ENTETE in l_upper:
+                etat["started"] = True
+            continue
+        if FIN_RE.search(l_upper):
+            etat["arreter"] = True
+            break
+        # Extraire tous les montants de la ligne
+        montants = MONTANT_RE.findall(ligne)
+        debit = None
+        credit = None
+        if len(montants) == 1:
+            # On ne sait pas si c'est débit ou crédit, on met dans débit
+            debit = float(montants[0].replace(',', '.'))
+        elif len(montants) >= 2:
+            debit = float(montants[0].replace(',', '.'))
+            credit = float(montants[1].replace(',', '.'))
+        debits.append(debit)
+        credits.append(credit)
+        log.debug("Ligne : %s | Débit : %s | Crédit : %s", ligne, debit, credit)
+    return debits, credits
+
+
+# Moteur par position: montant "1 234,56" découpé en mots "1" et "234,56" (recollés), ou "1.234,56" d'un seul mot
+MONTANT_MOT_RE = re.compile(r"^-?(?:\d{1,3}(?:\.\d{3})+|\d+),\d{2}$")
+MILLIERS_RE = re.compile(r"^-?\d{1,3}$")
+SUITE_MILLIERS_RE = re.compile(r"^\d{3}(?:,\d{2})?$")
+# Ligne d'opération: commence par sa date ("11.06", "11/06/25")
+DATE_OPERATION_RE = re.compile(r"^\d{2}[./]\d{2}")
+# Soldes et reports (haut ou bas de page, sans date d'opération): jamais des opérations
+REPORT_RE = re.compile(r"\bSOLDE\b|\bREPORT")
+# Tolérances en points: mots d'une même ligne (écart vertical), chiffres d'un même montant (écart horizontal)
+TOL_LIGNE = 2.0
+TOL_MOT = 1.5
+# Chevauchement toléré entre deux caractères d'un même mot (crénage)
+TOL_CHEVAUCHEMENT = 0.5
+TOL_MILLIERS = 4.0
+
+
+def mots_page(page):
+    """Mots de la page ({"text", "x0", "x1", "top"}, comme page.extract_words()) lus en une passe sur la
+    mise en page pdfminer: les caractères ne passent pas par page.chars, qui convertit chacun en
+    dictionnaire de tous ses attributs (couleurs, police, matrice...), l'essentiel du coût d'une page.
+    """
+    layout = page.layout
+    chars = []
+    pile = [layout]
+    while pile:
+        obj = pile.pop()
+        if isinstance(obj, LTChar):
+            texte = obj.get_text()
+            if not texte.isspace():
+                chars.append((layout.y1 - obj.y1, obj.x0, obj.x1, texte))
+        elif isinstance(obj, LTContainer):
+            pile.extend(obj)
+    # Caractères regroupés d'abord par ligne (hauteur à TOL_LIGNE près, corps de police mélangés), puis
+    # triés de gauche à droite dans la ligne: un caractère ne rejoint le mot précédent que s'il le suit
+    # directement (écart entre -TOL_CHEVAUCHEMENT et TOL_MOT), jamais un mot situé plus à gauche
+    lignes = []
+    for c in sorted(chars):
+        if lignes and c[0] - lignes[-1][0][0] <= TOL_LIGNE:
+            lignes[-1].append(c)
+        else:
+            lignes.append([c])
+    mots = []
+    for ligne in lignes:
+        mot = None
+        for top, x0, x1, texte in sorted(ligne, key=lambda c: c[1]):
+            if mot is not None and -TOL_CHEVAUCHEMENT <= x0 - mot["x1"] <= TOL_MOT:
+                mot["text"] += texte
+                mot["x1"] = x1
+                continue
+            mot = {"text": texte, "x0": x0, "x1": x1, "top": top}
+            mots.append(mot)
+    return mots
+
+
+def _lignes(mots):
+    """Mots de la page regroupés par ligne (même hauteur à TOL_LIGNE près), de gauche à droite."""
+    ligne = []
+    haut = None
+    for mot in sorted(mots, key=lambda m: (round(m["top"]), m["x0"])):
+        if haut is not None and abs(mot["top"] - haut) > TOL_LIGNE:
+            yield sorted(ligne, key=lambda m: m["x0"])
+            ligne = []
+        if not ligne:
+            haut = mot["top"]
+        ligne.append(mot)
+    if ligne:
+        yield sorted(ligne, key=lambda m: m["x0"])
+
+
+def _titre(mot):
+    return mot["text"].upper().replace("É", "E")
+
+
+def _est_entete(ligne):
+    titres = {_titre(m) for m in ligne}
+    return "DEBIT" in titres and "CREDIT" in titres
+
+
+def colonnes_entete(ligne):
+    """Ligne d'en-tête "DATE LIBELLE VALEUR DEBIT CREDIT" -> abscisses de début des colonnes débit et crédit.
+    Frontières au milieu des intervalles entre le titre précédent et DEBIT, puis entre DEBIT et CREDIT.
+    """
+    titres = [_titre(m) for m in ligne]
+    i_debit, i_credit = titres.index("DEBIT"), titres.index("CREDIT")
+    debit, credit = ligne[i_debit], ligne[i_credit]
+    avant = ligne[i_debit - 1]["x1"] if i_debit else debit["x0"]
+    return {"debit": (avant + debit["x0"]) / 2, "credit": (debit["x1"] + credit["x0"]) / 2}
+
+
+def _montants_ligne(ligne):
+    """Montants de la ligne avec leur bord droit (colonnes alignées à droite): [(x1, valeur)].
+    Milliers séparés par des espaces recollés ("1 234 567,89"), ou par des points dans un seul mot ("1.234,56").
+    """
+    out = []
+    i = 0
+    while i < len(ligne):
+        mot = ligne[i]
+        texte, x1 = mot["text"], mot["x1"]
+        if MILLIERS_RE.match(texte):
+            # Groupes de 3 chiffres qui suivent, jusqu'à celui qui porte les centimes
+            while (i + 1 < len(ligne) and "," not in texte and SUITE_MILLIERS_RE.match(ligne[i + 1]["text"])
+                   and ligne[i + 1]["x0"] - x1 <= TOL_MILLIERS):
+                i += 1
+                texte, x1 = texte + ligne[i]["text"], ligne[i]["x1"]
+        if MONTANT_MOT_RE.match(texte):
+            out.append((x1, float(texte.replace('.', '').replace(',', '.'))))
+        i += 1
+    return out
+
+
+def montants_page_mots(mots, etat):
+    """Débits et crédits d'une page d'après la position des mots (mots_page()), en une passe.
+    Les colonnes sont calculées sur la première ligne d'en-tête rencontrée puis gardées dans `etat`:
+    les pages suivantes ne font que repérer leur en-tête (lignes lues en dessous) ou, sans en-tête,
+    sont lues avec les colonnes en cache à partir de leur première ligne datée (le solde reporté et
+    l'en-tête de page au-dessus sont ignorés). Les lignes de solde ou de report non datées ne comptent pas.
+    """
     debits = []
     credits = []
-    started = False
-    arreter = False
+    lignes = list(_lignes(mots))
+    debut = None
+    for i, ligne in enumerate(lignes):
+        if _est_entete(ligne):
+            debut = i + 1
+            if etat["colonnes"] is None:
+                etat["colonnes"] = colonnes_entete(ligne)
+            break
+    if debut is None:
+        if etat["colonnes"] is None:
+            # Tableau des opérations pas encore commencé
+            return debits, credits
+        debut = next((i for i, ligne in enumerate(lignes) if DATE_OPERATION_RE.match(ligne[0]["text"])), len(lignes))
+        if any(FIN_RE.search(" ".join(m["text"] for m in ligne).upper()) for ligne in lignes[:debut]):
+            # Fin du tableau avant toute opération de la page
+            etat["arreter"] = True
+            return debits, credits
+        if debut == len(lignes) and any(_montants_ligne(ligne) for ligne in lignes):
+            log.warning("Page sans en-tête ni ligne datée: montants ignorés")
+    cols = etat["colonnes"]
+    for ligne in lignes[debut:]:
+        texte = " ".join(m["text"] for m in ligne)
+        texte_maj = texte.upper()
+        if FIN_RE.search(texte_maj):
+            etat["arreter"] = True
+            break
+        if REPORT_RE.search(texte_maj) and not DATE_OPERATION_RE.match(texte):
+            log.debug("Ligne ignorée (solde/report) : %s", texte)
+            continue
+        debit = credit = None
+        for x, montant in _montants_ligne(ligne):
+            if x >= cols["credit"]:
+                credit = montant
+                credits.append(montant)
+            elif x >= cols["debit"]:
+                debit = montant
+                debits.append(montant)
+        log.debug("Ligne : %s | Débit : %s | Crédit : %s", texte, debit, credit)
+    return debits, credits
+
+
+def iter_pages(pdf_path, stop=None, moteur="mots"):
+    """Analyse page par page: {"page", "pages", "debits", "credits"} pour chaque page lue.
+    moteur "mots": colonnes par position des mots (mots_page, défaut); "texte": ordre des montants dans chaque ligne
+    de extract_text() (un montant seul est compté en débit).
+    S'arrête à la fin du tableau des opérations, ou avant la page suivante si `stop` est positionné.
+    """
+    etat = {"started": False, "arreter": False, "colonnes": None}
     with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            if arreter:
+        pages = pdf.pages
+        for num, page in enumerate(pages, 1):
+            if etat["arreter"] or (stop is not None and stop.is_set()):
                 break
-            texte = page.extract_text()
-            if not texte:
-                continue
-            lignes = texte.splitlines()
-            for ligne in lignes:
-                l_upper = ligne.upper()
-                if not started and "DATE LIBELLE VALEUR DEBIT CREDIT" in l_upper:
-                    started = True
-                    continue
-                if not started:
-                    continue
-                if "INFORMATION PREALABLE" in l_upper or "SOLDE EN EUROS" in l_upper:
-                    arreter = True
-                    break
-                # Extraire tous les montants de la ligne
-                montants = re.findall(r"\d+,\d{2}", ligne)
-                debit = None
-                credit = None
-                if len(montants) == 1:
-                    # On ne sait pas si c'est débit ou crédit, on met dans débit
-                    debit = float(montants[0].replace(',', '.'))
-                elif len(montants) >= 2:
-                    debit = float(montants[0].replace(',', '.'))
-                    credit = float(montants[1].replace(',', '.'))
-                debits.append(debit)
-                credits.append(credit)
-                print(f"[DEBUG] Ligne : {ligne}")
-                print(f"[DEBUG] Débit : {debit} | Crédit : {credit}")
-    print("Débits extraits :", debits)
-    print("Crédits extraits :", credits)
+            try:
+                if moteur == "mots":
+                    debits, credits = montants_page_mots(mots_page(page), etat)
+                else:
+                    debits, credits = montants_page(page.extract_text() or "", etat)
+            finally:
+                # Libère le cache de la page (caractères, objets): mémoire stable sur les longs relevés
+                page.close()
+            yield {"page": num, "pages": len(pages), "debits": debits, "credits": credits}
+
+
+def extraire_debits(pdf_path, moteur="mots"):
+    debits = []
+    credits = []
+    for res in iter_pages(pdf_path, moteur=moteur):
+        debits.extend(res["debits"])
+        credits.extend(res["credits"])
+    log.debug("Débits extraits : %s", debits)
+    log.debug("Crédits extraits : %s", credits)
     return debits, credits
 
+
+def _analyse(chemin, events, stop):
+    # Thread de travail: les résultats partent dans `events`, seule la boucle Tk touche aux widgets
+    try:
+        for res in iter_pages(chemin, stop):
+            events.put(("page", res))
+        events.put(("annule" if stop.is_set() else "fin", None))
+    except Exception as e:
+        log.exception("Erreur lors de l'analyse de %s", chemin)
+        events.put(("erreur", e))
+
+
+class Analyse:
+    """Analyse en cours: thread de travail, file d'événements et totaux cumulés au fil des pages."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.events = queue.Queue()
+        self.stop = threading.Event()
+        self.somme_debits = 0.0
+        self.somme_credits = 0.0
+        self.thread = threading.Thread(target=_analyse, args=(chemin, self.events, self.stop), daemon=True)
+        self.thread.start()
+
+
+analyse = None
+
+
+def afficher_totaux(prefixe=""):
+    result_var.set(f"{prefixe}Débits : {analyse.somme_debits:.2f} € | Crédits : {analyse.somme_credits:.2f} €")
+
+
+def suivre_analyse():
+    # Appelée par la boucle Tk: consomme les événements du thread sans jamais bloquer
+    global analyse
+    if analyse is None:
+        return
+    try:
+        while True:
+            kind, data = analyse.events.get_nowait()
+            if kind == "page":
+                analyse.somme_debits += sum(d for d in data["debits"] if d is not None)
+                analyse.somme_credits += sum(c for c in data["credits"] if c is not None)
+                progress.configure(maximum=data["pages"], value=data["page"])
+                status_var.set(f"Page {data['page']} / {data['pages']}")
+                afficher_totaux()
+                continue
+            if kind == "fin":
+                progress.configure(value=progress["maximum"])
+                status_var.set("Analyse terminée")
+                afficher_totaux()
+            elif kind == "annule":
+                status_var.set("Analyse annulée")
+                afficher_totaux("(partiel) ")
+            else:
+                status_var.set("")
+                messagebox.showerror("Erreur", f"Erreur lors de l'analyse : {data}")
+            analyse = None
+            btn.configure(state="normal")
+            btn_annuler.configure(state="disabled")
+            return
+    except queue.Empty:
+        pass
+    root.after(50, suivre_analyse)
+
+
 def choisir_fichier():
+    global analyse
     chemin = filedialog.askopenfilename(
         title="Sélectionner un relevé PDF",
         filetypes=[("Fichiers PDF", "*.pdf")]
     )
     if not chemin:
         return
-    try:
-        debits, credits = extraire_debits(chemin)
-        somme_debits = sum([d for d in debits if d is not None])
-        somme_credits = sum([c for c in credits if c is not None])
-        result_var.set(f"Débits : {somme_debits:.2f} € | Crédits : {somme_credits:.2f} €")
-    except Exception as e:
-        messagebox.showerror("Erreur", f"Erreur lors de l'analyse : {e}")
+    analyse = Analyse(chemin)
+    btn.configure(state="disabled")
+    btn_annuler.configure(state="normal")
+    progress.configure(value=0, maximum=1)
+    status_var.set("Ouverture du relevé...")
+    afficher_totaux()
+    root.after(50, suivre_analyse)
+
+
+def annuler():
+    if analyse is not None:
+        analyse.stop.set()
+        status_var.set("Annulation...")
+
+
+if __name__ == "__main__":
+    if "--debug" in sys.argv:
+        logging.basicConfig(level=logging.DEBUG, format="[%(levelname)s] %(message)s")
 
+    # Interface Tkinter
+    root = tk.Tk()
+    root.title("Calculateur de débits PDF")
+    root.geometry("350x230")
+    root.resizable(False, False)
 
 
-# Interface Tkinter
-root = tk.Tk()
-root.title("Calculateur de débits PDF")
-root.geometry("350x180")
-root.resizable(False, False)
+    frame = tk.Frame(root, padx=20, pady=10)
+    frame.pack(expand=True, fill="both")
 
+    label = tk.Label(frame, text="Sélectionnez un relevé PDF à analyser :", font=("Arial", 11))
+    label.pack(pady=(0, 5))
 
-frame = tk.Frame(root, padx=20, pady=10)
-frame.pack(expand=True, fill="both")
 
-label = tk.Label(frame, text="Sélectionnez un relevé PDF à analyser :", font=("Arial", 11))
-label.pack(pady=(0, 5))
+    btn = tk.Button(frame, text="Somme des débits", command=choisir_fichier, font=("Arial", 11, "bold"), bg="#30345d", fg="white")
+    btn.pack(pady=(0, 10))
 
+    progress = ttk.Progressbar(frame, mode="determinate", length=300)
+    progress.pack()
 
-btn = tk.Button(frame, text="Somme des débits", command=choisir_fichier, font=("Arial", 11, "bold"), bg="#30345d", fg="white")
-btn.pack(pady=(0, 10))
+    status_var = tk.StringVar()
+    status_label = tk.Label(frame, textvariable=status_var, font=("Arial", 9))
+    status_label.pack()
 
+    btn_annuler = tk.Button(frame, text="Annuler", command=annuler, state="disabled")
+    btn_annuler.pack(pady=(5, 0))
 
 
-result_var = tk.StringVar()
-result_label = tk.Label(frame, textvariable=result_var, font=("Arial", 12, "bold"), fg="#30345d")
-result_label.pack(pady=(10, 0))
+    result_var = tk.StringVar()
+    result_label = tk.Label(frame, textvariable=result_var, font=("Arial", 12, "bold"), fg="#30345d")
+    result_label.pack(pady=(10, 0))
 
-root.mainloop()
+    root.mainloop()
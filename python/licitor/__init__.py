@@ -0,0 +1,34 @@
+"""Scraper des ventes aux enchères immobilières Licitor.
+
+    from licitor import scrape
+    for fiche in scrape(pages=2, concurrency=4, since=7):
+        ...
+
+Les sous-modules (requests, bs4, sqlite...) ne sont importés qu'au premier accès à un nom exporté.
+"""
+import importlib
+
+_EXPORTS = {
+    "scrape": "crawler",
+    "run": "crawler",
+    "Crawler": "crawler",
+    "ScrapeConfig": "config",
+    "main": "cli",
+    "HttpClient": "transport",
+    "ListingStore": "store",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,36 @@
+"""Point de reprise d'un crawl, réécrit (atomiquement) après chaque page de liste terminée.
+
+Contenu: date de début du run, URLs de liste crawlées, dernière page terminée par région (toutes ses fiches
+enregistrées), URLs détail déjà récupérées et nombre de fiches. Les fiches elles-mêmes sont déjà dans la base SQLite (vidée avant chaque
+point de reprise) et dans le journal JSON Lines du run. Un run terminé supprime le fichier; un run
+interrompu (crash, arrêt, barre d'espace) le laisse pour que le suivant reprenne à la page d'après.
+"""
+import json
+import os
+
+from .output import write_bytes_atomic
+
+
+class Checkpoint:
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, listing_urls: list[str]) -> dict | None:
+        """État sauvegardé, ou None s'il est absent, illisible ou issu d'un crawl d'autres listes."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get("listing_urls") != listing_urls:
+            return None
+        return state
+
+    def save(self, state: dict) -> None:
+        write_bytes_atomic(self.path, json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
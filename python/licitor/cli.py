@@ -0,0 +1,16 @@
+"""Ligne de commande: `python -m licitor [--pages N] [--incremental] ...` (ou `python scraper.py`)."""
+import os
+
+from .config import config_from_argv
+
+
+def main(argv: list[str] | None = None) -> dict | None:
+    config = config_from_argv(argv)
+    # Import différé: --help ne charge ni requests, ni bs4, ni le pool de processus
+    from .crawler import run
+
+    if config.profile:
+        from .metrics import run_profiled
+
+        return run_profiled(lambda: run(config), config.profile, os.path.join(config.data_dir, "run_profile.prof"))
+    return run(config)
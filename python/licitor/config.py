@@ -0,0 +1,184 @@
+"""Configuration d'un crawl: valeurs par défaut, surchargées par les variables d'environnement,
+elles-mêmes surchargées par les arguments de la ligne de commande (ou par les paramètres de scrape()).
+"""
+import argparse
+import os
+import re
+from dataclasses import dataclass, field, fields, replace
+
+# Dossier python/ du projet: emplacement par défaut des sorties, du cache, de la base et des photos
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REGION_URL = "https://www.licitor.com/ventes-aux-encheres-immobilieres/{region}/prochaines-ventes.html?p={page}"
+BASE_URL = REGION_URL.format(region="paris-et-ile-de-france", page="{page}")
+_REGION_RE = re.compile(r"/ventes-aux-encheres-immobilieres/([^/?#]+)/")
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; Scraper/1.0)"}
+
+
+def _env(name: str, default, cast=int, minimum=None):
+    raw = os.getenv(name)
+    if raw:
+        try:
+            val = cast(raw)
+            return max(minimum, val) if minimum is not None else val
+        except ValueError:
+            pass
+    return default
+
+
+def _at_least(minimum, cast=int):
+    """Type argparse: même bornage que _env() pour les valeurs passées en ligne de commande."""
+    def parse(raw: str):
+        try:
+            return max(minimum, cast(raw))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"valeur invalide: {raw!r}")
+    parse.__name__ = cast.__name__
+    return parse
+
+
+def _env_list(name: str) -> list[str]:
+    return _split_list(os.getenv(name, ""))
+
+
+def _split_list(raw: str) -> list[str]:
+    return [p.strip() for p in raw.split(",") if p.strip()]
+
+
+def region_url(region: str) -> str:
+    """Slug Licitor ("bretagne") ou URL de liste -> modèle d'URL avec {page}."""
+    if not region.startswith(("http://", "https://")):
+        return REGION_URL.format(region=region, page="{page}")
+    if "{page}" in region:
+        return region
+    return region + ("&" if "?" in region else "?") + "p={page}"
+
+
+def region_name(url: str) -> str:
+    """Nom de région d'une URL de liste (le slug Licitor), à défaut l'URL elle-même."""
+    m = _REGION_RE.search(url)
+    return m.group(1) if m else url
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    return raw.lower() in ("1", "true", "yes")
+
+
+@dataclass
+class ScrapeConfig:
+    # Limite de pages de liste (MAX_PAGE)
+    pages: int = field(default_factory=lambda: _env("MAX_PAGE", 50, minimum=1))
+    base_url: str = BASE_URL
+    # Régions (slugs Licitor ou URLs de liste) crawlées en parallèle; vide = base_url seule
+    regions: list[str] = field(default_factory=lambda: _env_list("REGIONS"))
+    # Régions crawlées simultanément (0 = toutes); la politesse par hôte reste globale
+    region_workers: int = field(default_factory=lambda: _env("REGION_WORKERS", 0, minimum=0))
+    # Nombre de pages détail récupérées en parallèle (1 = comportement séquentiel)
+    concurrency: int = field(default_factory=lambda: _env("CONCURRENCY", 8, minimum=1))
+    # Politesse par hôte: requêtes simultanées max et délai minimal (s) entre deux départs vers le même hôte.
+    # Par défaut 1 requête à la fois et 1 s d'écart, comme l'ancienne boucle time.sleep(1): à relever explicitement.
+    host_max_parallel: int = field(default_factory=lambda: _env("HOST_MAX_PARALLEL", 1, minimum=1))
+    host_min_interval: float = field(default_factory=lambda: _env("HOST_MIN_INTERVAL", 1.0, float, 0.0))
+    # Transport HTTP: pool de connexions keep-alive par hôte (0 = max(concurrency, 10)), relances et backoff
+    pool_size: int = field(default_factory=lambda: _env("HTTP_POOL_SIZE", 0, minimum=0))
+    retries: int = field(default_factory=lambda: _env("HTTP_RETRIES", 3, minimum=0))
+    backoff: float = field(default_factory=lambda: _env("HTTP_BACKOFF", 0.5, float, 0.0))
+    # Cache disque des pages HTML. TTL 0 = toujours revalider (ETag / Last-Modified).
+    cache: bool = field(default_factory=lambda: _env_flag("HTTP_CACHE", True))
+    cache_dir: str = field(default_factory=lambda: os.getenv("HTTP_CACHE_DIR") or os.path.join(DATA_DIR, ".http_cache"))
+    cache_ttl: float = field(default_factory=lambda: _env("HTTP_CACHE_TTL", 0.0, float, 0.0))
+    cache_max_mb: int = field(default_factory=lambda: _env("HTTP_CACHE_MAX_MB", 200, minimum=1))
+    # Rejeu hors ligne: tout le pipeline d'extraction tourne depuis le cache, sans aucun accès réseau
+    offline: bool = field(default_factory=lambda: _env_flag("OFFLINE"))
+    # Mode incrémental: ne re-télécharger que les pages détail nouvelles ou plus vieilles que max_age_days
+    incremental: bool = field(default_factory=lambda: _env_flag("INCREMENTAL"))
+    max_age_days: float = field(default_factory=lambda: _env("MAX_AGE_DAYS", 7.0, float, 0.0))
+    # Étape de parsing: nombre de processus (0 = parsing dans les threads de téléchargement)
+    parse_workers: int = field(default_factory=lambda: _env("PARSE_WORKERS", min(4, os.cpu_count() or 1), minimum=0))
+    # Photos: téléchargements parallèles en arrière-plan, re-vérification après N jours, largeur des miniatures
+    photos: bool = True
+    photo_workers: int = field(default_factory=lambda: _env("PHOTO_WORKERS", 4, minimum=1))
+    photo_max_age_days: float = field(default_factory=lambda: _env("PHOTO_MAX_AGE_DAYS", 30.0, float, 0.0))
+    thumb_width: int = field(default_factory=lambda: _env("THUMB_WIDTH", 480, minimum=16))
+    # Interruption par la barre d'espace (module optionnel 'keyboard', en local)
+    keyboard: bool = True
+    # Sorties
+    data_dir: str = DATA_DIR
+    public_dir: str = field(default_factory=lambda: os.path.normpath(os.path.join(DATA_DIR, "..", "public")))
+    precompress: bool = field(default_factory=lambda: _env_flag("PRECOMPRESS"))
+    # Géographie: export BAN local pour géocoder les annonces sans carte, zoom des tuiles du front
+    gazetteer_path: str = field(default_factory=lambda: os.getenv("GAZETTEER") or os.path.join(DATA_DIR, "gazetteer.csv"))
+    geo_tile_zoom: int = field(default_factory=lambda: _env("GEO_TILE_ZOOM", 13, minimum=1))
+    # Base SQLite des annonces et taille des transactions d'écriture
+    store_path: str = field(default_factory=lambda: os.getenv("LISTINGS_DB") or os.path.join(DATA_DIR, "listings.db"))
+    store_batch: int = field(default_factory=lambda: _env("STORE_BATCH", 50, minimum=1))
+    # Point de reprise réécrit après chaque page; resume=False repart de la page 1 en l'ignorant
+    checkpoint_path: str = field(
+        default_factory=lambda: os.getenv("CRAWL_CHECKPOINT") or os.path.join(DATA_DIR, "crawl_checkpoint.json")
+    )
+    resume: bool = field(default_factory=lambda: _env_flag("CRAWL_RESUME", True))
+    # Rapport JSON de fin de run (+ historique JSON Lines) et profilage optionnel ("cprofile" / "pyinstrument")
+    report_path: str = field(default_factory=lambda: os.getenv("RUN_REPORT") or os.path.join(DATA_DIR, "run_report.json"))
+    history_path: str = field(default_factory=lambda: os.getenv("RUN_HISTORY") or os.path.join(DATA_DIR, "run_reports.jsonl"))
+    profile: str = field(default_factory=lambda: os.getenv("SCRAPER_PROFILE", ""))
+
+    def listing_urls(self) -> dict[str, str]:
+        """Région -> modèle d'URL de liste, dans l'ordre de la configuration."""
+        urls = [region_url(r) for r in self.regions] or [self.base_url]
+        return {region_name(u): u for u in urls}
+
+    @property
+    def effective_pool_size(self) -> int:
+        return self.pool_size or max(self.concurrency, 10)
+
+    def with_options(self, **options) -> "ScrapeConfig":
+        """Copie avec certains champs remplacés (les valeurs None sont ignorées)."""
+        known = {f.name for f in fields(self)}
+        unknown = set(options) - known
+        if unknown:
+            raise TypeError(f"Options inconnues: {', '.join(sorted(unknown))}")
+        return replace(self, **{k: v for k, v in options.items() if v is not None})
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="licitor", description="Scraper des ventes aux enchères Licitor.")
+    ap.add_argument("--pages", type=_at_least(1), help="nombre de pages de liste (MAX_PAGE, défaut 50)")
+    ap.add_argument("--regions", type=_split_list, help="régions (slugs ou URLs de liste) séparées par des virgules")
+    ap.add_argument("--region-workers", type=_at_least(0), help="régions crawlées simultanément (0 = toutes)")
+    ap.add_argument("--concurrency", type=_at_least(1), help="pages détail en parallèle (CONCURRENCY, défaut 8)")
+    ap.add_argument("--host-parallel", dest="host_max_parallel", type=_at_least(1),
+                    help="requêtes simultanées par hôte (HOST_MAX_PARALLEL, défaut 1)")
+    ap.add_argument("--host-delay", dest="host_min_interval", type=_at_least(0.0, float),
+                    help="délai minimal entre deux requêtes vers le même hôte (HOST_MIN_INTERVAL, défaut 1 s)")
+    ap.add_argument("--pool-size", type=_at_least(0), help="connexions keep-alive par hôte")
+    ap.add_argument("--retries", type=_at_least(0), help="relances sur 429/5xx")
+    ap.add_argument("--backoff", type=_at_least(0.0, float), help="facteur de backoff exponentiel")
+    ap.add_argument("--no-cache", dest="cache", action="store_const", const=False, help="désactiver le cache HTTP")
+    ap.add_argument("--cache-ttl", type=_at_least(0.0, float), help="durée de validité du cache HTTP (s)")
+    ap.add_argument("--cache-max-mb", type=_at_least(1), help="taille maximale du cache HTTP (Mo)")
+    ap.add_argument("--offline", action="store_const", const=True, help="rejeu depuis le cache, sans réseau")
+    ap.add_argument("--incremental", action="store_const", const=True, help="ignorer les fiches déjà à jour")
+    ap.add_argument("--max-age", dest="max_age_days", type=_at_least(0.0, float),
+                    help="âge max d'une fiche en mode incrémental (j)")
+    ap.add_argument("--parse-workers", type=_at_least(0), help="processus de parsing (0 = dans les threads)")
+    ap.add_argument("--photo-workers", type=_at_least(1), help="téléchargements de photos en parallèle")
+    ap.add_argument("--photo-max-age", dest="photo_max_age_days", type=_at_least(0.0, float),
+                    help="re-vérification des photos (j)")
+    ap.add_argument("--thumb-width", type=_at_least(16), help="largeur des miniatures WebP (px)")
+    ap.add_argument("--precompress", action="store_const", const=True, help="variantes .gz/.br des fichiers du front")
+    ap.add_argument("--gazetteer", dest="gazetteer_path", help="export BAN (CSV) pour le géocodage hors ligne")
+    ap.add_argument("--tile-zoom", dest="geo_tile_zoom", type=_at_least(1),
+                    help="niveau de zoom des tuiles géographiques")
+    ap.add_argument("--store-batch", type=_at_least(1), help="fiches par transaction SQLite")
+    ap.add_argument("--no-resume", dest="resume", action="store_const", const=False,
+                    help="ignorer le point de reprise d'un run interrompu")
+    ap.add_argument("--profile", choices=("cprofile", "pyinstrument"), help="profiler le run")
+    return ap
+
+
+def config_from_argv(argv: list[str] | None = None) -> ScrapeConfig:
+    args = build_parser().parse_args(argv)
+    return ScrapeConfig().with_options(**vars(args))
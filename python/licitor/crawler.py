@@ -0,0 +1,720 @@
+"""Crawl des ventes Licitor: pages de liste, pages détail, fusion et exports.
+
+- Crawler.iter_records() produit les fiches d'une liste dans l'ordre des cartes (générateur, mémoire bornée);
+  Crawler.iter_regions() crawle plusieurs régions en parallèle sous la même limite de débit.
+- scrape() est le point d'entrée bibliothèque: pas d'écriture de fichiers hormis cache HTTP et photos.
+- run() est le run complet de la ligne de commande: base SQLite, CSV/JSON, index du front, rapport.
+"""
+import hashlib
+import importlib
+import json
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator
+
+from .checkpoint import Checkpoint
+from .config import ScrapeConfig, region_name
+from .extract import listing_number, parse_detail, parse_html
+from .metrics import Metrics
+from .geo import backfill_coords
+from .output import JsonlWriter, copy_atomic, write_csv_atomic, write_geo_tiles, write_json_atomic, write_shards
+from .photos import PhotoPipeline
+from .store import ListingStore
+from .transport import HttpClient
+
+
+def _load_existing(public_path: str, local_path: str) -> list[dict]:
+    # Préfère le JSON public si présent, sinon local; sinon []
+    for p in (public_path, local_path):
+        try:
+            if os.path.exists(p):
+                with open(p, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                    if isinstance(data, list):
+                        return data
+        except Exception:
+            continue
+    return []
+
+def _key_for(item: dict) -> str:
+    # Clé de déduplication: Number prioritaire, sinon lien, sinon fallback sur trio (ville|adresse|mise_a_prix)
+    num = (item.get("Number") or "").strip()
+    if num:
+        return f"NUM:{num}"
+    lien = (item.get("lien") or "").strip()
+    if lien:
+        return f"URL:{lien}"
+    ville = (item.get("ville") or "").strip().lower()
+    adr = (item.get("adresse") or "").strip().lower()
+    prix = (item.get("mise_a_prix") or "").strip()
+    return f"FALL:{ville}|{adr}|{prix}"
+
+# Champs de la carte et de la page détail qui changent d'un passage à l'autre (baisse de mise à prix,
+# report de la vente...): la valeur du dernier crawl l'emporte dès qu'elle est renseignée
+_VOLATILE_FIELDS = (
+    "ville", "description", "mise_a_prix", "adresse", "date_visite", "date_vente", "latitude", "longitude",
+    "Court", "SousLot", "FirstSousLot", "Trusts", "photo_thumb",
+)
+
+def _merge_record(base: dict, it: dict) -> dict:
+    # Fusion champ à champ: valeurs nouvelles non vides pour les champs volatils, sinon on remplit
+    # seulement les vides de base (un champ absent du nouveau passage n'efface rien)
+    out = base.copy()
+    # Carte modifiée depuis le passage précédent: les textes du nouveau passage font foi
+    edited = bool(it.get("card_fingerprint")) and it.get("card_fingerprint") != base.get("card_fingerprint")
+    for key, val in it.items():
+        if not val:
+            continue
+        if not out.get(key) or key in _VOLATILE_FIELDS:
+            out[key] = val
+        # Si le nouveau texte est plus long (description), on prend le plus informatif
+        elif key in ("texte", "AdditionalText"):
+            if isinstance(val, str) and (edited or len(val) > len(out.get(key, ""))):
+                out[key] = val
+    # Coordonnées géocodées hors ligne: remplacées par celles de la carte de la page dès qu'elle en a
+    if out.get("geo_precision") and it.get("latitude") and it.get("longitude"):
+        out["latitude"], out["longitude"] = it["latitude"], it["longitude"]
+        del out["geo_precision"]
+    # Horodatage et empreinte de carte: toujours ceux du dernier passage (les champs qu'elle couvre
+    # viennent d'être repris du même passage)
+    for key in ("scraped_at", "card_fingerprint"):
+        if it.get(key):
+            out[key] = it[key]
+    return out
+
+def _merge_into(merged: dict[str, dict], it: dict) -> None:
+    # Intégrer une fiche: remplacer si clé déjà présente, en privilégiant champs non vides
+    k = _key_for(it)
+    merged[k] = _merge_record(merged[k], it) if k in merged else it
+
+def _merge_items(existing: list[dict], new_items: list[dict]) -> list[dict]:
+    merged: dict[str, dict] = {}
+    # D'abord, indexer l'existant
+    for it in existing:
+        merged[_key_for(it)] = it
+    # Puis intégrer les nouveaux
+    for it in new_items:
+        _merge_into(merged, it)
+    return list(merged.values())
+
+def _card_key(detail_url: str) -> str:
+    # Même clé que _key_for() sur la fiche qui sera produite: Number tiré de l'URL, sinon lien
+    return _key_for({"Number": listing_number(detail_url), "lien": detail_url})
+
+def _card_fingerprint(fields: dict) -> str:
+    # Empreinte des champs visibles sur la carte (prix, intitulé...): change si l'annonce est modifiée
+    raw = "|".join(fields.get(k, "") for k in ("ville", "description", "texte", "mise_a_prix"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def _is_fresh(record: dict, fingerprint: str, since: datetime) -> bool:
+    # À jour: carte inchangée et fiche récupérée après `since`
+    if record.get("card_fingerprint") != fingerprint:
+        return False
+    try:
+        scraped_at = datetime.fromisoformat(record.get("scraped_at", ""))
+    except ValueError:
+        return False
+    if scraped_at.tzinfo is None:
+        scraped_at = scraped_at.replace(tzinfo=timezone.utc)
+    return scraped_at >= since
+
+def _since_cutoff(since, now: datetime) -> datetime:
+    """`since` accepté sous forme de datetime (naïf = heure locale), timedelta ou nombre de jours."""
+    if isinstance(since, datetime):
+        return since.astimezone(timezone.utc)
+    if isinstance(since, timedelta):
+        return now - since
+    return now - timedelta(days=float(since))
+
+def _empty_extras(lien: str = "") -> dict:
+    return {"AdditionalText": "", "Court": "", "SousLot": "", "Trusts": "", "Number": "", "lien": lien}
+
+def _parse_card(card) -> tuple[dict, str]:
+    """Champs lus sur la carte de la page de liste + URL de la page détail ("" si absente)."""
+    ville = card.select_one(".City")
+    description = card.select_one(".Name")
+    texte_el = card.select_one(".Text")
+    mise_a_prix = card.select_one(".PriceNumber")
+    link = card.select_one("a.Ad")
+    detail_url = "https://www.licitor.com" + link["href"] if link and link.has_attr("href") else ""
+    fields = {
+        "ville": ville.get_text(strip=True) if ville else "",
+        "description": description.get_text(strip=True) if description else "",
+        "texte": texte_el.get_text(strip=True) if texte_el else "",
+        "mise_a_prix": mise_a_prix.get_text(strip=True) if mise_a_prix else "",
+    }
+    return fields, detail_url
+
+def _load_keyboard():
+    # Import optionnel de 'keyboard' (interrompre le scraping avec la barre d'espace en local);
+    # pas bloquant en prod / VPS
+    try:
+        return importlib.import_module("keyboard")
+    except Exception:
+        return None
+
+
+class Crawler:
+    """Un crawl: client HTTP, pool de processus de parsing et pipeline photo, ouverts par open()
+    (ou `with Crawler(...)`) et libérés par close(). Les crawlers de région (region()) partagent ces
+    ressources, donc la limite de débit par hôte du client, avec le crawler parent.
+    """
+
+    def __init__(self, config: ScrapeConfig, metrics: Metrics | None = None, client: HttpClient | None = None,
+                 stop: threading.Event | None = None):
+        self.config = config
+        self.metrics = metrics or Metrics()
+        self.client = client or HttpClient(config, self.metrics)
+        self._owns_client = client is None
+        self._parse_pool = None
+        self._photos = None
+        self.region_name = region_name(config.base_url)
+        self.fetched = 0
+        self.skipped = 0
+        # Dernière page terminée par région (renseigné par iter_regions)
+        self.completed_pages: dict[str, int] = {}
+        # Arrêt demandé (stop(), barre d'espace): le crawl s'est terminé avant la dernière page
+        self.interrupted = False
+        # `stop` appartient à l'appelant (démon...): le crawler le lit mais ne le lève jamais lui-même.
+        # stop() et l'arrêt des régions restantes sur erreur passent par _abort, propre au crawl.
+        self._stop = stop or threading.Event()
+        self._abort = threading.Event()
+        # Dernière page de liste parcourue et dernière page dont toutes les fiches ont été produites
+        self._listed_page = 0
+        self._completed_page = 0
+
+    def open(self) -> "Crawler":
+        cfg = self.config
+        self._parse_pool = ProcessPoolExecutor(max_workers=cfg.parse_workers) if cfg.parse_workers > 0 else None
+        if cfg.photos:
+            self._photos = PhotoPipeline(
+                os.path.join(cfg.data_dir, "Pictures"), self.client.photo_get, workers=cfg.photo_workers,
+                thumb_width=cfg.thumb_width, max_age_days=cfg.photo_max_age_days, offline=cfg.offline,
+                metrics=self.metrics, thumbs_dir=os.path.join(cfg.public_dir, "thumbs"), thumbs_url="/thumbs",
+            )
+        return self
+
+    def close(self) -> None:
+        if self._photos is not None:
+            self._photos.close()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def region(self, name: str, base_url: str) -> "Crawler":
+        """Crawler d'une région: même client HTTP, pools, photos, métriques et signal d'arrêt que celui-ci."""
+        child = Crawler(replace(self.config, base_url=base_url), self.metrics, self.client, self._stop)
+        child.region_name = name
+        child._abort = self._abort
+        child._parse_pool, child._photos = self._parse_pool, self._photos
+        return child
+
+    def stop(self) -> None:
+        """Demande l'arrêt du crawl avant la page de liste suivante (appelable depuis un autre thread)."""
+        self._abort.set()
+
+    @property
+    def completed_page(self) -> int:
+        return self._completed_page
+
+    @property
+    def photo_stats(self) -> dict:
+        return dict(self._photos.stats) if self._photos is not None else {}
+
+    def scrape_detail(self, detail_url):
+        metrics = self.metrics
+        adresse = ""
+        photo = ""
+        date_visite = ""
+        date_vente = ""
+        latitude = ""
+        longitude = ""
+        full_texte = ""
+        try:
+            with metrics.timer("detail_fetch"):
+                detail_r = self.client.get(detail_url)
+                detail_r.raise_for_status()
+            # Parsing unique de la page (voir extract.py), dans le pool de processus s'il existe
+            with metrics.timer("detail_parse_wall"):
+                if self._parse_pool is not None:
+                    fields = self._parse_pool.submit(parse_detail, detail_r.text, detail_url).result()
+                else:
+                    fields = parse_detail(detail_r.text, detail_url)
+            for name, seconds in fields["timings"].items():
+                metrics.observe(f"parse:{name}", seconds)
+            for name in fields["failures"]:
+                print(f"Extracteur {name} en échec sur {detail_url}")
+                metrics.failure(name)
+            adresse = fields["adresse"]
+            # Photo principale: téléchargée en arrière-plan, la fiche reçoit un Future résolu à l'assemblage
+            photo_url = fields["photo_url"]
+            if photo_url:
+                photo = self._photos.submit(photo_url) if self._photos is not None else photo_url
+            date_visite = fields["date_visite"]
+            date_vente = fields["date_vente"]
+            latitude, longitude = fields["latitude"], fields["longitude"]
+            full_texte = fields["texte"]
+            extras = fields["extras"]
+        except Exception as e:
+            print(f"Erreur page détail {detail_url} : {e}")
+            metrics.failure("detail_page")
+            extras = _empty_extras(detail_url)
+        return adresse, photo, date_visite, date_vente, latitude, longitude, full_texte, extras
+
+    def _scrape_card_detail(self, detail_url: str):
+        if not detail_url:
+            return "", "", "", "", "", "", "", _empty_extras()
+        return self.scrape_detail(detail_url)
+
+    def _build_item(self, fields: dict, detail_url: str, detail, scraped_at: str = "") -> dict:
+        adresse, photo, date_visite, date_vente, latitude, longitude, full_texte, extras = detail
+        photo_thumb = ""
+        if isinstance(photo, Future):
+            with self.metrics.timer("photo_wait"):
+                photo, photo_thumb = photo.result()
+            # Chemins locaux relatifs au dossier python/ ("Pictures/..."), comme avant le passage en paquet;
+            # la miniature est déjà un chemin web ("/thumbs/<empreinte>.webp", servi depuis public/)
+            photo, photo_thumb = (
+                os.path.relpath(p, self.config.data_dir) if p.startswith(self.config.data_dir) else p
+                for p in (photo, photo_thumb)
+            )
+        return {
+            "ville": fields["ville"],
+            "description": fields["description"],
+            "texte": full_texte or fields["texte"],
+            "mise_a_prix": fields["mise_a_prix"],
+            "adresse": adresse,
+            "photo": photo,
+            "photo_thumb": photo_thumb,
+            "date_visite": date_visite,
+            "date_vente": date_vente,
+            "latitude": latitude,
+            "longitude": longitude,
+            # Champs additionnels
+            "AdditionalText": extras.get("AdditionalText", ""),
+            "Court": extras.get("Court", ""),
+            "SousLot": extras.get("SousLot", ""),
+            "FirstSousLot": extras.get("FirstSousLot", ""),
+            "Trusts": extras.get("Trusts", ""),
+            "Number": extras.get("Number", ""),
+            "lien": extras.get("lien", detail_url),
+            "region": self.region_name,
+            "scraped_at": scraped_at,
+            "card_fingerprint": _card_fingerprint(fields),
+        }
+
+    def _complete_pages(self, pending: deque, on_page) -> None:
+        # Une page est terminée quand elle a été parcourue et qu'aucune de ses fiches n'est encore en attente
+        # (la file est dans l'ordre des cartes). Le consommateur a alors traité toutes ses fiches.
+        while self._completed_page < self._listed_page and (not pending or pending[0][0] > self._completed_page + 1):
+            self._completed_page += 1
+            if on_page is not None:
+                on_page(self._completed_page)
+
+    def _drain(self, pending: deque, limit: int, scraped_at: str, on_page=None) -> Iterator[dict]:
+        while pending and (len(pending) > limit or pending[0][3].done()):
+            _, fields, detail_url, fut = pending.popleft()
+            item = self._build_item(fields, detail_url, fut.result(), scraped_at)
+            self.fetched += 1
+            self.metrics.incr("records_fetched")
+            yield item
+            self._complete_pages(pending, on_page)
+
+    def iter_records(self, lookup: Callable[[str], dict | None] | None = None, since: datetime | None = None,
+                     scraped_at: str = "", start_page: int = 1, skip_urls=frozenset(),
+                     on_page: Callable[[int], None] | None = None) -> Iterator[dict]:
+        """Fiches du crawl, dans l'ordre des cartes. Avec `lookup` (clé -> fiche connue) et `since`, les cartes
+        inchangées dont la fiche a été récupérée après `since` sont ignorées, et la pagination s'arrête
+        sur la première page entièrement connue.
+
+        Reprise: le crawl commence à `start_page` et ignore les pages détail de `skip_urls`. on_page(n) est
+        appelé dès que toutes les fiches des pages 1..n ont été produites et traitées par le consommateur.
+        """
+        cfg = self.config
+        metrics = self.metrics
+        scraped_at = scraped_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+        keyboard = _load_keyboard() if cfg.keyboard else None
+        # Étape 1 (threads): téléchargement des pages détail, soumises dès que leur page de liste est lue.
+        # Étape 2 (processus): parsing du HTML brut transmis par l'étape 1.
+        # Les fiches sortent au fil de l'eau dans l'ordre des cartes, ce qui donne le même résultat
+        # qu'un parcours séquentiel; la file d'attente est bornée pour garder une mémoire stable.
+        max_pending = cfg.concurrency * 4
+        pending: deque = deque()
+        self._listed_page = self._completed_page = start_page - 1
+        with ThreadPoolExecutor(max_workers=cfg.concurrency) as pool:
+            for page in range(start_page, cfg.pages + 1):
+                if keyboard and keyboard.is_pressed('space'):
+                    print("Scraping interrompu par l'utilisateur (barre d'espace).")
+                    self.interrupted = True
+                    break
+                if self._stop.is_set() or self._abort.is_set():
+                    print("Scraping interrompu (arrêt demandé).")
+                    self.interrupted = True
+                    break
+                url = cfg.base_url.format(page=page)
+                print(f"Scraping page {page} : {url}")
+                try:
+                    with metrics.timer("listing_fetch"):
+                        r = self.client.get(url)
+                        r.raise_for_status()
+                except Exception as e:
+                    print(f"Erreur lors de la récupération de la page {page} : {e}")
+                    metrics.failure("listing_page")
+                    self._listed_page = page
+                    self._complete_pages(pending, on_page)
+                    continue
+                with metrics.timer("listing_parse"):
+                    soup = parse_html(r.text)
+                    cards = soup.select("ul.AdResults > li")
+                metrics.incr("listing_pages")
+                metrics.incr("cards", len(cards))
+                page_skipped = 0
+                page_resumed = 0
+                for card in cards:
+                    fields, detail_url = _parse_card(card)
+                    if detail_url and detail_url in skip_urls:
+                        # Déjà récupérée avant l'interruption du run repris
+                        page_resumed += 1
+                        continue
+                    record = lookup(_card_key(detail_url)) if lookup and since and detail_url else None
+                    if record is not None and _is_fresh(record, _card_fingerprint(fields), since):
+                        page_skipped += 1
+                        continue
+                    pending.append((page, fields, detail_url, pool.submit(self._scrape_card_detail, detail_url)))
+                    yield from self._drain(pending, max_pending, scraped_at, on_page)
+                self.skipped += page_skipped
+                metrics.incr("cards_skipped", page_skipped)
+                resumed = f", {page_resumed} déjà récupérées avant reprise" if page_resumed else ""
+                print(f"Page {page} traitée, {len(cards)} annonces trouvées, {page_skipped} déjà à jour{resumed}.")
+                self._listed_page = page
+                self._complete_pages(pending, on_page)
+                if lookup and cards and page_skipped == len(cards):
+                    print("Page entièrement connue: arrêt de la pagination.")
+                    break
+            yield from self._drain(pending, 0, scraped_at, on_page)
+
+    def iter_regions(self, lookup: Callable[[str], dict | None] | None = None, since: datetime | None = None,
+                     scraped_at: str = "", start_pages: dict[str, int] | None = None, skip_urls=frozenset(),
+                     on_page: Callable[[str, int], None] | None = None) -> Iterator[dict]:
+        """Fiches de toutes les régions de la configuration, chacune marquée de sa région.
+
+        Une seule région: iter_records() directement. Plusieurs: un thread par région (au plus
+        config.region_workers), fiches et fins de page transmises au consommateur par une file bornée.
+        on_page(région, n) est appelé dans le thread du consommateur, après les fiches de la page n.
+        """
+        start_pages = start_pages or {}
+        scraped_at = scraped_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+        children = [self.region(name, url) for name, url in self.config.listing_urls().items()]
+        self.completed_pages = {c.region_name: start_pages.get(c.region_name, 1) - 1 for c in children}
+
+        def page_done(name: str, page: int) -> None:
+            self.completed_pages[name] = page
+            if on_page is not None:
+                on_page(name, page)
+
+        def records(child: "Crawler", done: Callable[[int], None]) -> Iterator[dict]:
+            return child.iter_records(lookup, since, scraped_at, start_pages.get(child.region_name, 1), skip_urls, done)
+
+        if len(children) == 1:
+            child = children[0]
+            try:
+                yield from records(child, lambda page: page_done(child.region_name, page))
+            finally:
+                self._collect(children)
+            return
+
+        # Fin de région: ("done", nom, exception ou None)
+        q: queue.Queue = queue.Queue(maxsize=self.config.concurrency * 4)
+
+        def work(child: "Crawler") -> None:
+            error = None
+            try:
+                for item in records(child, lambda page: q.put(("page", child.region_name, page))):
+                    q.put(("item", item))
+            except BaseException as e:
+                error = e
+            q.put(("done", child.region_name, error))
+
+        workers = self.config.region_workers or len(children)
+        remaining = len(children)
+        error = None
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="region") as pool:
+            for child in children:
+                pool.submit(work, child)
+            try:
+                while remaining:
+                    msg = q.get()
+                    if msg[0] == "item":
+                        yield msg[1]
+                    elif msg[0] == "page":
+                        page_done(msg[1], msg[2])
+                    else:
+                        remaining -= 1
+                        if msg[2] is not None and error is None:
+                            print(f"Erreur crawl de la région {msg[1]} : {msg[2]}")
+                            error = msg[2]
+                            self._abort.set()
+            finally:
+                if remaining:
+                    # Consommateur arrêté ou erreur: arrêter les régions et vider la file pour libérer leurs threads
+                    self._abort.set()
+                    while remaining:
+                        if q.get()[0] == "done":
+                            remaining -= 1
+                self._collect(children)
+        if error is not None:
+            raise error
+
+    def _collect(self, children: list["Crawler"]) -> None:
+        self.fetched = sum(c.fetched for c in children)
+        self.skipped = sum(c.skipped for c in children)
+        self.interrupted = any(c.interrupted for c in children)
+
+
+def scrape(pages: int | None = None, concurrency: int | None = None, since=None,
+           config: ScrapeConfig | None = None, **options) -> Iterator[dict]:
+    """Générateur des fiches du crawl, dans l'ordre des cartes.
+
+    `since` (datetime, timedelta ou nombre de jours): ignorer les annonces inchangées déjà récupérées
+    depuis cette date, d'après la base SQLite (mode incrémental). Les autres options sont des champs
+    de ScrapeConfig (offline=True, parse_workers=0, photos=False...).
+    """
+    options.setdefault("keyboard", False)
+    config = (config or ScrapeConfig()).with_options(pages=pages, concurrency=concurrency, **options)
+    now = datetime.now(timezone.utc)
+    if since is None and config.incremental:
+        since = timedelta(days=config.max_age_days)
+    cutoff = _since_cutoff(since, now) if since is not None else None
+    store = ListingStore(config.store_path, _key_for) if cutoff and os.path.exists(config.store_path) else None
+    try:
+        with Crawler(config) as crawler:
+            yield from crawler.iter_regions(
+                lookup=store.get if store else None, since=cutoff, scraped_at=now.isoformat(timespec="seconds")
+            )
+    finally:
+        if store is not None:
+            store.close()
+
+
+def run(config: ScrapeConfig | None = None, stop: threading.Event | None = None) -> dict:
+    """Run complet: crawl, fusion dans la base SQLite, exports CSV/JSON/index et rapport. Retourne le rapport.
+
+    Reprend un run interrompu depuis son point de reprise (config.resume). `stop` permet d'arrêter le crawl
+    proprement depuis un autre thread: les fiches déjà récupérées sont exportées et le point de reprise conservé.
+    """
+    config = config or ScrapeConfig()
+    here = config.data_dir
+    public_json = os.path.join(config.public_dir, "licitor_samples.json")
+    local_json = os.path.join(here, "licitor_samples.json")
+    shards_dir = os.path.join(config.public_dir, "licitor")
+    local_csv = os.path.join(here, "licitor_samples.csv")
+    run_jsonl = os.path.join(here, "licitor_run.jsonl")
+    metrics = Metrics()
+    # Les annonces vivent dans la base SQLite; au premier run (base vide) elle est initialisée depuis
+    # le JSON existant, dans le même ordre. La fusion se fait ensuite ligne par ligne (upsert).
+    store = ListingStore(config.store_path, _key_for)
+    if store.count() == 0:
+        existing = _load_existing(public_json, local_json)
+        if existing:
+            store.upsert_many(existing, lambda base, it: it)
+            print(f"Base {config.store_path} initialisée avec {len(existing)} annonces.")
+    listing_urls = config.listing_urls()
+    checkpoint = Checkpoint(config.checkpoint_path)
+    state = checkpoint.load(list(listing_urls.values())) if config.resume else None
+    if state:
+        # Reprise: même horodatage que le run interrompu, pages terminées et pages détail déjà vues sautées
+        run_started = datetime.fromisoformat(state["started_at"])
+        start_pages = {name: page + 1 for name, page in state["regions"].items()}
+        done_urls = set(state["fetched_urls"])
+        fetched_before = state["fetched"]
+        print(
+            f"Reprise du run du {state['started_at']} ("
+            + ", ".join(f"{name}: page {page}" for name, page in start_pages.items())
+            + f", {fetched_before} fiches déjà enregistrées)."
+        )
+    else:
+        run_started = datetime.now(timezone.utc)
+        start_pages = {}
+        done_urls = set()
+        fetched_before = 0
+    scraped_at = run_started.isoformat(timespec="seconds")
+
+    mode = f"incrémental, âge max {config.max_age_days:g} j" if config.incremental else "complet"
+    if config.offline:
+        mode += ", rejeu hors ligne depuis le cache"
+    if len(listing_urls) > 1:
+        mode += f", {len(listing_urls)} régions"
+    print(
+        f"Démarrage du scraping ({mode}, concurrence: {config.concurrency}, "
+        f"processus de parsing: {config.parse_workers})..."
+    )
+    batch: list[dict] = []
+    store_stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    def flush() -> None:
+        if batch:
+            with metrics.timer("store_upsert"):
+                for k, v in store.upsert_many(batch, _merge_record, scraped_at).items():
+                    store_stats[k] += v
+            batch.clear()
+
+    crawler = Crawler(config, metrics, stop=stop)
+    fetched_urls = list(done_urls)
+    fetched = fetched_before
+
+    def on_page(region: str, page: int) -> None:
+        # Toutes les fiches des pages 1..page de la région sont produites: les enregistrer,
+        # puis noter le point de reprise
+        flush()
+        checkpoint.save({
+            "listing_urls": list(listing_urls.values()),
+            "started_at": scraped_at,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "pages": config.pages,
+            "regions": crawler.completed_pages,
+            "fetched": fetched,
+            "fetched_urls": fetched_urls,
+        })
+
+    # Journal JSON Lines des fiches du run, écrit au fur et à mesure (complété en cas de reprise)
+    journal = JsonlWriter(run_jsonl, append=bool(state))
+    try:
+        with crawler:
+            records = crawler.iter_regions(
+                lookup=store.get if config.incremental else None,
+                since=run_started - timedelta(days=config.max_age_days) if config.incremental else None,
+                scraped_at=scraped_at,
+                start_pages=start_pages,
+                skip_urls=done_urls,
+                on_page=on_page,
+            )
+            for item in records:
+                fetched += 1
+                journal.write(item)
+                if item["lien"]:
+                    fetched_urls.append(item["lien"])
+                batch.append(item)
+                if len(batch) >= config.store_batch:
+                    flush()
+            flush()
+    finally:
+        journal.close()
+    if crawler.interrupted:
+        print(f"Point de reprise conservé: {config.checkpoint_path}")
+    else:
+        checkpoint.clear()
+    http_stats = crawler.client.stats
+    print("Statistiques HTTP:")
+    print(http_stats.summary())
+    ps = crawler.photo_stats
+    if ps:
+        print(
+            f"Photos: {ps['downloaded']} téléchargées ({ps['bytes'] / 1e6:.1f} Mo), {ps['not_modified']} inchangées (304), "
+            f"{ps['reused']} déjà présentes, {ps['deduplicated']} dédupliquées, {ps['failed']} échecs."
+        )
+
+    skipped = crawler.skipped
+    if not fetched and skipped:
+        print(f"Aucune nouvelle annonce: {skipped} fiches déjà à jour, jeu de données inchangé.")
+    elif not fetched:
+        print("Aucune annonce n'a été récupérée. Vérifiez la connexion internet, le site ou les sélecteurs.")
+    else:
+        if skipped:
+            print(f"{fetched} fiches récupérées, {skipped} déjà à jour ignorées.")
+        print(
+            f"Base: {store_stats['inserted']} annonces ajoutées, {store_stats['updated']} mises à jour, "
+            f"{store_stats['unchanged']} inchangées."
+        )
+        with metrics.timer("store_export"):
+            merged_items = store.all()
+        # Champs normalisés (prix, dates ISO, surface, lots, occupation...) des fiches nouvelles ou modifiées
+        try:
+            from .features import apply_features
+
+            with metrics.timer("features"):
+                changed = apply_features(merged_items)
+                store.set_data(changed)
+            if changed:
+                print(f"Champs normalisés: {len(changed)} fiches recalculées.")
+        except Exception as e:
+            print(f"Erreur calcul des champs normalisés: {e}")
+            metrics.failure("features")
+        # Annonces sans carte: coordonnées retrouvées dans le gazetteer local (adresse, voie ou commune)
+        try:
+            with metrics.timer("geocode"):
+                located = backfill_coords(merged_items, config.gazetteer_path)
+                store.set_data(located)
+            if located:
+                print(f"Géocodage hors ligne: {len(located)} annonces localisées.")
+        except Exception as e:
+            print(f"Erreur géocodage: {e}")
+            metrics.failure("geocode")
+        # CSV local (dans le dossier python)
+        try:
+            with metrics.timer("write_csv"):
+                write_csv_atomic(local_csv, merged_items)
+            print(f"Écrit: {local_csv}")
+        except Exception as e:
+            print(f"Erreur écriture CSV: {e}")
+            metrics.failure("write_csv")
+        # JSON compact dans le dossier public du projet pour usage direct par le front,
+        # puis copie octet pour octet à côté du script (dossier python): une seule sérialisation
+        try:
+            with metrics.timer("write_json"):
+                write_json_atomic(public_json, merged_items)
+                print(f"Écrit: {public_json}")
+                copy_atomic(public_json, local_json)
+                print(f"Écrit: {local_json}")
+        except Exception as e:
+            print(f"Erreur écriture JSON: {e}")
+            metrics.failure("write_json")
+        # Index léger + une fiche par annonce pour le front (évite de télécharger tout le jeu de données)
+        try:
+            with metrics.timer("write_shards"):
+                written = write_shards(shards_dir, merged_items, precompress=config.precompress)
+            print(f"Écrit: {shards_dir} (index + {written} fiches mises à jour)")
+        except Exception as e:
+            print(f"Erreur écriture index/fiches: {e}")
+            metrics.failure("write_shards")
+        # Tuiles géographiques pour la carte (chargement des seules tuiles visibles)
+        try:
+            geo_dir = os.path.join(shards_dir, "geo")
+            with metrics.timer("write_geo_tiles"):
+                tiles = write_geo_tiles(geo_dir, merged_items, zoom=config.geo_tile_zoom, precompress=config.precompress)
+            print(f"Écrit: {geo_dir} ({tiles} tuiles mises à jour)")
+        except Exception as e:
+            print(f"Erreur écriture tuiles: {e}")
+            metrics.failure("write_geo_tiles")
+    store.close()
+
+    # Rapport de run lisible par machine (suivi des régressions sous PM2)
+    report = metrics.write_report(
+        config.report_path,
+        config.history_path,
+        config={
+            "pages": config.pages, "regions": list(listing_urls), "concurrency": config.concurrency,
+            "parse_workers": config.parse_workers,
+            "incremental": config.incremental, "offline": config.offline, "cache": crawler.client.cache is not None,
+        },
+        records={"fetched": fetched, "skipped": skipped, **store_stats},
+        progress={
+            "start_pages": start_pages, "completed_pages": crawler.completed_pages, "interrupted": crawler.interrupted,
+        },
+        http=http_stats.as_dict(),
+        photos=ps,
+    )
+    print(f"Rapport de run ({report['duration_s']:.1f}s): {config.report_path}")
+    return report
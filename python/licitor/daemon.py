@@ -0,0 +1,237 @@
+"""Service résident du scraper: crawls planifiés, reprise après crash, statut local en HTTP.
+
+    python -m licitor.daemon --every 6h [--at 06:00,18:00] [--status-port 8765] [options du scraper]
+
+- Planning: toutes les `--every` (30m, 6h, 1d...) depuis le début du dernier run, ou aux heures `--at`.
+- Chaque run est le run complet de la ligne de commande (licitor.crawler.run) avec son point de reprise:
+  après un crash ou un redémarrage, un run interrompu est repris immédiatement à la page suivante.
+- Un run en échec est relancé après `--retry-delay` au lieu d'attendre le prochain créneau.
+- SIGTERM / SIGINT (arrêt PM2): le crawl en cours s'arrête avant la page suivante, point de reprise conservé.
+- GET http://127.0.0.1:<port>/status: état, dernier run, prochain run, progression; /healthz: "ok".
+"""
+import json
+import os
+import re
+import signal
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .checkpoint import Checkpoint
+from .config import ScrapeConfig, build_parser
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(raw: str) -> float:
+    """"90" (secondes), "30m", "6h", "1d" -> secondes."""
+    m = _DURATION.match(raw or "")
+    if not m:
+        raise ValueError(f"durée invalide: {raw!r} (ex. 30m, 6h, 1d)")
+    return float(m.group(1)) * _UNITS[m.group(2)]
+
+
+def parse_times(raw: str) -> list[tuple[int, int]]:
+    """"06:00,18:30" -> [(6, 0), (18, 30)] (heure locale)."""
+    out = []
+    for part in filter(None, (p.strip() for p in (raw or "").split(","))):
+        hh, _, mm = part.partition(":")
+        hour, minute = int(hh), int(mm or 0)
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"heure invalide: {part!r}")
+        out.append((hour, minute))
+    return sorted(out)
+
+
+def next_run_time(now: datetime, every: float, at: list[tuple[int, int]], last_start: datetime | None) -> datetime:
+    """Prochain départ: première heure de `at` après `now`, sinon `every` secondes après le dernier départ."""
+    if at:
+        local = now.astimezone()
+        for day in (0, 1):
+            for hour, minute in at:
+                cand = (local + timedelta(days=day)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+                if cand > local:
+                    return cand.astimezone(timezone.utc)
+    if last_start is None:
+        return now
+    return max(now, last_start + timedelta(seconds=every))
+
+
+def _iso(dt: datetime | None) -> str | None:
+    return dt.isoformat(timespec="seconds") if dt else None
+
+
+class Scheduler:
+    def __init__(self, config: ScrapeConfig, every: float, at: list[tuple[int, int]] | None = None,
+                 retry_delay: float = 600.0):
+        self.config = config
+        self.every = every
+        self.at = at or []
+        self.retry_delay = retry_delay
+        self.checkpoint = Checkpoint(config.checkpoint_path)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+        self.state = "idle"
+        self.runs = 0
+        self.failures = 0
+        self.current_start: datetime | None = None
+        self.next_run: datetime | None = None
+        self.last_run: dict | None = None
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _pending_checkpoint(self) -> dict | None:
+        return self.checkpoint.load(list(self.config.listing_urls().values()))
+
+    def _last_start(self) -> datetime | None:
+        # Départ du dernier run, d'après le rapport de run (survit aux redémarrages du service)
+        try:
+            with open(self.config.report_path, "r", encoding="utf-8") as f:
+                return datetime.fromisoformat(json.load(f)["started_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _run_once(self) -> None:
+        from .crawler import run
+
+        start = datetime.now(timezone.utc)
+        with self._lock:
+            self.state = "running"
+            self.current_start = start
+        t0 = time.perf_counter()
+        entry = {"started_at": _iso(start)}
+        try:
+            report = run(self.config, stop=self._stop)
+            entry.update(ok=True, records=report.get("records"), progress=report.get("progress"))
+        except Exception as e:
+            traceback.print_exc()
+            entry.update(ok=False, error=f"{type(e).__name__}: {e}")
+        entry["duration_s"] = round(time.perf_counter() - t0, 1)
+        with self._lock:
+            self.state = "idle"
+            self.current_start = None
+            self.runs += 1
+            self.failures += int(not entry["ok"])
+            self.last_run = entry
+
+    def run_forever(self) -> None:
+        cfg = self.config
+        # Run interrompu (crash, arrêt): reprise immédiate, sans attendre le prochain créneau
+        resume = cfg.resume and self._pending_checkpoint() is not None
+        last_start = self._last_start()
+        while not self._stop.is_set():
+            now = datetime.now(timezone.utc)
+            if self.last_run is not None and not self.last_run["ok"]:
+                nxt = now + timedelta(seconds=self.retry_delay)
+            elif resume:
+                nxt = now
+            else:
+                nxt = next_run_time(now, self.every, self.at, last_start)
+            with self._lock:
+                self.next_run = nxt
+            delay = (nxt - now).total_seconds()
+            if delay > 0:
+                print(f"Prochain run: {nxt.astimezone().isoformat(timespec='seconds')}")
+                if self._stop.wait(delay):
+                    break
+            last_start = datetime.now(timezone.utc)
+            self._run_once()
+            resume = cfg.resume and self._pending_checkpoint() is not None and not self._stop.is_set()
+        print("Service scraper arrêté.")
+
+    def status(self) -> dict:
+        with self._lock:
+            out = {
+                "state": self.state,
+                "pid": os.getpid(),
+                "service_started_at": _iso(self.started_at),
+                "schedule": {"every_s": self.every, "at": [f"{h:02d}:{m:02d}" for h, m in self.at]},
+                "runs": self.runs,
+                "failures": self.failures,
+                "current_run_started_at": _iso(self.current_start),
+                "next_run": _iso(self.next_run) if self.state == "idle" else None,
+                "last_run": self.last_run,
+            }
+        state = self._pending_checkpoint()
+        if state:
+            out["checkpoint"] = {
+                "started_at": state.get("started_at"),
+                "updated_at": state.get("updated_at"),
+                "regions": state.get("regions"),
+                "pages": state.get("pages"),
+                "fetched": state.get("fetched"),
+            }
+        return out
+
+
+def serve_status(scheduler: Scheduler, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Démarre le serveur de statut dans un thread (local uniquement par défaut)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path in ("", "/status"):
+                body, ctype, code = json.dumps(scheduler.status(), ensure_ascii=False).encode("utf-8"), "application/json", 200
+            elif path == "/healthz":
+                body, ctype, code = b"ok", "text/plain", 200
+            else:
+                body, ctype, code = b"not found", "text/plain", 404
+            self.send_response(code)
+            self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="status-http", daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = build_parser()
+    ap.prog = "licitor.daemon"
+    ap.description = "Service résident du scraper Licitor (crawls planifiés avec reprise)."
+    ap.add_argument("--every", default=os.getenv("SCRAPER_EVERY", "6h"), help="intervalle entre deux runs (défaut 6h)")
+    ap.add_argument("--at", default=os.getenv("SCRAPER_AT", ""), help="heures fixes, ex. 06:00,18:00 (remplace --every)")
+    ap.add_argument("--retry-delay", default=os.getenv("SCRAPER_RETRY_DELAY", "10m"), help="relance après un échec")
+    ap.add_argument("--status-port", type=int, default=int(os.getenv("SCRAPER_STATUS_PORT", "8765")),
+                    help="port du statut HTTP local (0 = désactivé)")
+    args = vars(ap.parse_args(argv))
+    try:
+        every = parse_duration(args.pop("every"))
+        at = parse_times(args.pop("at"))
+        retry_delay = parse_duration(args.pop("retry_delay"))
+    except ValueError as e:
+        ap.error(str(e))
+    port = args.pop("status_port")
+    args.pop("profile", None)
+    config = ScrapeConfig(keyboard=False).with_options(**args)
+
+    scheduler = Scheduler(config, every, at, retry_delay)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: scheduler.stop())
+    server = None
+    if port:
+        try:
+            server = serve_status(scheduler, port)
+            print(f"Statut: http://127.0.0.1:{port}/status")
+        except OSError as e:
+            print(f"Serveur de statut indisponible (port {port}) : {e}")
+    try:
+        scheduler.run_forever()
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
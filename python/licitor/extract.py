@@ -0,0 +1,330 @@
+"""Extraction des champs d'une page détail Licitor.
+
+Chaque page est parsée une seule fois (lxml si disponible, sinon html.parser), sérialisée au plus
+une fois (pour les regex qui portent sur le HTML brut) et parcourue une seule fois par _scan_detail(),
+qui indexe en un passage les éléments par classe, les liens de carte, les attributs data-*, les <p>
+et les chaînes recherchées ("Visite", "Tribunal", "Maître"/"Ferrari"). Les fonctions extract_*
+restent appelables seules; scrape_detail() leur passe le parcours et le HTML partagés.
+"""
+import importlib.util
+import re
+import time
+from urllib.parse import urlparse, parse_qs
+
+from bs4 import BeautifulSoup, NavigableString
+
+# lxml n'est qu'un moteur de BeautifulSoup: on vérifie sa présence sans l'importer
+PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+# Regex précompilées
+_GEO_JSONLD_RE = re.compile(r'"geo"\s*:\s*\{[^}]*?"latitude"\s*:\s*([\-\d\.]+)[^}]*?"longitude"\s*:\s*([\-\d\.]+)', re.I | re.S)
+_AT_COORDS_RE = re.compile(r'@\s*(-?\d{1,3}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)')
+_PAIR_RE = re.compile(r'(-?\d{1,3}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)')
+_SETVIEW_RE = re.compile(r'setView\(\s*\[\s*(-?\d{1,3}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)\s*\]')
+_LATLNG_RE = re.compile(r'LatLng\(\s*(-?\d{1,3}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)\s*\)')
+_NUMBER_RE = re.compile(r"/(\d+)\.html(?:$|\?)")
+_SOUSLOT_RE = re.compile(r"Sous\s*-?lot\s*:?\s*([^\n\r<]+)", re.I)
+_SPACE_NL_RE = re.compile(r"\s+\n")
+_MULTI_NL_RE = re.compile(r"\n{3,}")
+
+_MAP_HOSTS = ("google.com/maps", "maps.google.", "openstreetmap.org", "osm.org")
+
+# Sélecteurs (une classe chacun), dans l'ordre de priorité d'origine
+_FULLTEXT_CLASSES = (
+    "Text", "Description", "Resume", "AdText", "MainText",
+    "ContentText", "texte", "description", "Designation", "Consistance",
+)
+_ADDITIONAL_FALLBACK_CLASSES = ("Additional", "Complement", "Compl", "ComplementText", "TextAdd")
+_SOUSLOT_CLASSES = ("SousLot", "SubLot", "Lot")  # ".Lots .Lot" est inclus dans ".Lot"
+_TRUST_CLASSES = ("Trusts", "Trust", "Avocat", "Avocats", "Lawyer", "Lawyers", "Cabinet", "Regisseur", "Regisseurs")
+_INDEXED_CLASSES = frozenset(
+    ("Street", "MainPhoto", "Date", "AdditionalText", "Court")
+    + _FULLTEXT_CLASSES + _ADDITIONAL_FALLBACK_CLASSES + _SOUSLOT_CLASSES + _TRUST_CLASSES
+)
+
+
+def listing_number(detail_url: str) -> str:
+    """Numéro d'annonce Licitor tiré de l'URL de la page détail (fin .../123456.html), "" sinon."""
+    m = _NUMBER_RE.search(detail_url)
+    return m.group(1) if m else ""
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, PARSER)
+
+
+def _scan_detail(detail_soup: BeautifulSoup) -> dict:
+    """Parcours unique de l'arbre. Les éléments indexés par classe sont des paires (rang, tag),
+    le rang permettant de réunir plusieurs classes dans l'ordre du document comme le ferait .select().
+    """
+    by_class: dict[str, list] = {}
+    map_links: list[str] = []
+    paragraphs: list = []
+    data_coords = None
+    visite = tribunal = None
+    trust_strings: list = []
+    for rank, node in enumerate(detail_soup.descendants):
+        if isinstance(node, NavigableString):
+            if not node:
+                continue
+            if visite is None and "Visite" in node:
+                visite = node
+            if tribunal is None and "Tribunal" in node:
+                tribunal = node
+            if "Maître" in node or "Ferrari" in node:
+                trust_strings.append(node)
+            continue
+        name = node.name
+        if name == "iframe" or name == "a":
+            src = node.get("src") or node.get("href")
+            if src:
+                map_links.append(src)
+        elif name == "p":
+            paragraphs.append(node)
+        attrs = node.attrs
+        if data_coords is None and attrs:
+            dlat = attrs.get("data-lat") or attrs.get("data-latitude")
+            dlng = attrs.get("data-lng") or attrs.get("data-longitude") or attrs.get("data-lon")
+            if dlat and dlng:
+                data_coords = (dlat, dlng)
+        classes = attrs.get("class")
+        if classes:
+            for cls in classes:
+                if cls in _INDEXED_CLASSES:
+                    by_class.setdefault(cls, []).append((rank, node))
+    return {
+        "by_class": by_class,
+        "map_links": map_links,
+        "paragraphs": paragraphs,
+        "data_coords": data_coords,
+        "visite": visite,
+        "tribunal": tribunal,
+        "trust_strings": trust_strings,
+    }
+
+
+def _first(scan: dict, cls: str):
+    found = scan["by_class"].get(cls)
+    return found[0][1] if found else None
+
+
+def _union(scan: dict, classes) -> list:
+    # Éléments portant l'une des classes, sans doublon, dans l'ordre du document
+    ranked = {}
+    for cls in classes:
+        for rank, el in scan["by_class"].get(cls, ()):
+            ranked[rank] = el
+    return [ranked[r] for r in sorted(ranked)]
+
+
+def _format_coord(val):
+    try:
+        return f"{float(val):.6f}"
+    except Exception:
+        return ""
+
+def extract_coords(detail_soup: BeautifulSoup, html: str | None = None, scan: dict | None = None) -> tuple[str, str]:
+    """Tente d'extraire (latitude, longitude) depuis différentes sources de la page détail.
+    Retourne des chaînes formatées ou ("", "") si introuvable.
+    Stratégies:
+      - iframe/a Google Maps (q=lat,lng ou @lat,lng)
+      - OpenStreetMap (mlat/mlon ou ?lat=&lon=)
+      - JSON-LD geo { latitude, longitude }
+      - Scripts init (Leaflet: setView([lat,lng]), Google: new google.maps.LatLng(lat,lng))
+      - data-* attributes (data-lat, data-lng)
+    """
+    lat = lng = ""
+    if html is None:
+        html = detail_soup.decode()
+    if scan is None:
+        scan = _scan_detail(detail_soup)
+
+    # 1) JSON-LD geo
+    m = _GEO_JSONLD_RE.search(html)
+    if m:
+        return _format_coord(m.group(1)), _format_coord(m.group(2))
+
+    # 2) Google Maps / OSM liens/iframes
+    for src in scan["map_links"]:
+        lower = src.lower()
+        if any(k in lower for k in _MAP_HOSTS):
+            # @lat,lng pattern
+            m = _AT_COORDS_RE.search(src)
+            if m:
+                return _format_coord(m.group(1)), _format_coord(m.group(2))
+            # q=lat,lng pattern
+            pr = urlparse(src)
+            qs = parse_qs(pr.query)
+            for key in ("q", "ll", "center"):
+                if key in qs:
+                    val = qs[key][0]
+                    m2 = _PAIR_RE.search(val)
+                    if m2:
+                        return _format_coord(m2.group(1)), _format_coord(m2.group(2))
+            # OSM: mlat/mlon or lat/lon
+            for la_key, lo_key in (("mlat", "mlon"), ("lat", "lon"), ("lat", "lng")):
+                if la_key in qs and lo_key in qs:
+                    return _format_coord(qs[la_key][0]), _format_coord(qs[lo_key][0])
+
+    # 3) Leaflet setView([lat, lng])
+    m = _SETVIEW_RE.search(html)
+    if m:
+        return _format_coord(m.group(1)), _format_coord(m.group(2))
+
+    # 4) google.maps.LatLng(lat, lng)
+    m = _LATLNG_RE.search(html)
+    if m:
+        return _format_coord(m.group(1)), _format_coord(m.group(2))
+
+    # 5) data-* attributes on any tag
+    if scan["data_coords"]:
+        dlat, dlng = scan["data_coords"]
+        return _format_coord(dlat), _format_coord(dlng)
+
+    return lat, lng
+
+def _get_text(el):
+    return el.get_text(" ", strip=True) if el else ""
+
+def extract_full_text(detail_soup: BeautifulSoup, scan: dict | None = None) -> str:
+    """Récupère le texte descriptif complet depuis la page détail.
+    Essaie plusieurs sélecteurs, agrège plusieurs blocs si nécessaire, puis choisit le plus long.
+    """
+    if scan is None:
+        scan = _scan_detail(detail_soup)
+    candidates: list[str] = []
+    for cls in _FULLTEXT_CLASSES:
+        for _, el in scan["by_class"].get(cls, ()):
+            t = el.get_text("\n", strip=True)
+            if t:
+                candidates.append(t)
+    # Fallback: concaténer les <p> les plus longs
+    if not candidates:
+        ps = [p.get_text("\n", strip=True) for p in scan["paragraphs"]]
+        ps = [p for p in ps if p and len(p) > 50]
+        if ps:
+            candidates.append("\n\n".join(ps))
+    if not candidates:
+        return ""
+    # Garder la version la plus longue (probablement la description complète)
+    full = max(candidates, key=len)
+    # Nettoyage léger
+    full = _SPACE_NL_RE.sub("\n", full)
+    full = _MULTI_NL_RE.sub("\n\n", full)
+    return full.strip()
+
+def extract_additional_fields(detail_soup: BeautifulSoup, detail_url: str, html: str | None = None, scan: dict | None = None) -> dict:
+    """Extrait AdditionalText, Court, SousLot (liste), Trusts, Number et lien.
+    Fallbacks: recherche par classes connues puis recherche textuelle/regex.
+    """
+    if scan is None:
+        scan = _scan_detail(detail_soup)
+    number = listing_number(detail_url)
+
+    # AdditionalText
+    additional = _get_text(_first(scan, "AdditionalText"))
+    if not additional:
+        # parfois du texte additionnel sous .Additional, .Complement, .Compl, ou bloc principal
+        for cls in _ADDITIONAL_FALLBACK_CLASSES:
+            additional = _get_text(_first(scan, cls))
+            if additional:
+                break
+
+    # Court (Tribunal)
+    court = _get_text(_first(scan, "Court"))
+    if not court:
+        # chercher un libellé contenant Tribunal et prendre le parent proche
+        found = scan["tribunal"]
+        if found and found.parent:
+            court = _get_text(found.parent)
+
+    # Sous-lots (plusieurs)
+    sous_lots = []
+    for el in _union(scan, _SOUSLOT_CLASSES):
+        txt = _get_text(el)
+        if txt:
+            sous_lots.append(txt)
+    if not sous_lots:
+        # regex sur le texte (sérialisation seulement si nécessaire)
+        if html is None:
+            html = detail_soup.decode()
+        for m in _SOUSLOT_RE.finditer(html):
+            sous_lots.append(m.group(1).strip())
+    first_sous_lot = sous_lots[0] if sous_lots else ""
+    sous_lot = " | ".join(dict.fromkeys([s for s in sous_lots if s]))  # unique et joint
+
+    # Trusts (avocats/régisseur/société)
+    trusts = []
+    for el in _union(scan, _TRUST_CLASSES):
+        txt = _get_text(el)
+        if txt:
+            trusts.append(txt)
+    # heuristique si vide: lignes contenant "Maître" ou "Ferrari"
+    if not trusts:
+        for s in scan["trust_strings"]:
+            val = _get_text(s.parent)
+            if val:
+                trusts.append(val)
+    trusts_text = " | ".join(dict.fromkeys([t for t in trusts if t]))
+
+    return {
+        "AdditionalText": additional,
+        "Court": court,
+        "SousLot": sous_lot,
+        "FirstSousLot": first_sous_lot,
+        "Trusts": trusts_text,
+        "Number": number,
+        "lien": detail_url,
+    }
+
+def parse_detail(html_text: str, detail_url: str) -> dict:
+    """Parse une page détail une fois et retourne tous ses champs, URL de la photo principale comprise.
+    Un extracteur en échec n'annule plus toute la fiche: son champ reste vide et son nom est listé dans
+    "failures". "timings" donne la durée (s) de chaque étape, mesurée là où le parsing s'exécute.
+    """
+    timings: dict[str, float] = {}
+    failures: list[str] = []
+
+    def timed(name, func, default):
+        start = time.perf_counter()
+        try:
+            return func()
+        except Exception:
+            failures.append(name)
+            return default
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    detail_soup = parse_html(html_text)
+    scan = _scan_detail(detail_soup)
+    # Sérialisation unique, partagée par les regex de coordonnées et de sous-lots
+    html = detail_soup.decode()
+    timings["parse_html"] = time.perf_counter() - start
+    adr = _first(scan, "Street")
+    img = None
+    for _, photo_box in scan["by_class"].get("MainPhoto", ()):
+        img = photo_box.find("img")
+        if img:
+            break
+    visit = scan["visite"]
+    date_tag = _first(scan, "Date")
+    latitude, longitude = timed("extract_coords", lambda: extract_coords(detail_soup, html=html, scan=scan), ("", ""))
+    texte = timed("extract_full_text", lambda: extract_full_text(detail_soup, scan=scan), "")
+    extras = timed(
+        "extract_additional_fields",
+        lambda: extract_additional_fields(detail_soup, detail_url, html=html, scan=scan),
+        {"AdditionalText": "", "Court": "", "SousLot": "", "Trusts": "", "Number": "", "lien": detail_url},
+    )
+    return {
+        "adresse": adr.get_text(strip=True) if adr else "",
+        "photo_url": img["src"] if img and img.has_attr("src") else "",
+        "date_visite": visit.strip() if visit else "",
+        "date_vente": date_tag.get_text(strip=True) if date_tag else "",
+        "latitude": latitude,
+        "longitude": longitude,
+        "texte": texte,
+        "extras": extras,
+        "timings": timings,
+        "failures": failures,
+    }
@@ -0,0 +1,129 @@
+"""Champs normalisés calculés sur tout le jeu de données, en une passe vectorisée pandas.
+
+À partir des chaînes brutes du scraper (mise_a_prix, date_vente, date_visite, SousLot, texte...):
+  prix (int), vente_iso / visite_iso (AAAA-MM-JJ), vente_heure (HH:MM), surface_m2 (float),
+  lots (numéros de lots), occupation ("libre", "occupé", "loué" ou ""), texte_net (description sans
+  l'en-tête et le pied de page du site).
+Les motifs sont compilés une fois et appliqués colonne par colonne (Series.str), jamais fiche par fiche.
+
+Incrémental: chaque fiche garde dans features_src une empreinte de ses champs sources (et de la version
+des règles); seules les fiches nouvelles ou dont l'empreinte a changé sont recalculées.
+pandas est optionnel: sans lui, l'étape est ignorée et les fiches restent telles quelles.
+"""
+import re
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+from .store import date_to_iso
+
+# À incrémenter quand les règles changent: toutes les fiches sont alors recalculées au run suivant
+FEATURES_VERSION = 2
+SOURCE_FIELDS = ("mise_a_prix", "date_vente", "date_visite", "SousLot", "FirstSousLot", "texte")
+FEATURE_FIELDS = ("prix", "vente_iso", "vente_heure", "visite_iso", "surface_m2", "lots", "occupation", "texte_net")
+
+_NON_DIGITS = re.compile(r"\D+")
+_PRICE_IN_TEXT = re.compile(r"[Mm]ise à prix\s*:?\s*(\d[\d\s.]*)\s*€")
+_HOUR = re.compile(r"à\s+(\d{1,2})\s*h\s*(\d{2})?")
+_SURFACE_TOTAL = re.compile(r"[Ss]urface totale[^\d\n]*(\d+(?:[.,]\d+)?)\s*m²")
+_SURFACE = re.compile(r"(\d{1,3}(?:[\s.]\d{3})+(?:,\d+)?|\d+(?:,\d+)?)\s*m²")
+_LOTS = re.compile(r"[Ll]ots?\s*n°\s*(\d+(?:\s*(?:,|et)\s*\d+)*)")
+_INT = re.compile(r"\d+")
+_OCCUPATION = re.compile(r"(?i)(libres?|occupée?s?|loué(?:e|s|es)?|bail)(?:\W|$)")
+_HEADER = re.compile(r"^\s*Nouveau\s*!\s*(?:Inscrivez-vous pour gérer votre agenda des enchères\s*)?")
+_FOOTER = re.compile(r"(?s)🔎.*")
+_NOISE_LINES = re.compile(r"(?m)^\s*Annonce non-officielle - Contenu non certifié\s*$")
+# Espaces multiples, tabulations et insécables -> une espace (les espaces simples ne sont pas réécrites)
+_SPACES = re.compile(r"(?:[\t ]| (?=[ \t ]))[ \t ]*")
+_BLANK_LINES = re.compile(r"\n\s*")
+_OCCUPATION_LABELS = {"lib": "libre", "occ": "occupé", "lou": "loué", "bai": "loué"}
+
+
+def _iso_dates(s: "pd.Series") -> "pd.Series":
+    """Date du texte ("jeudi 9 octobre 2025", "09/10/2025") -> "2025-10-09", sinon "".
+    Même analyse que la colonne vente_iso de la base (store.date_to_iso), appliquée une fois par valeur
+    distincte: les dates de vente se répètent beaucoup d'une annonce à l'autre.
+    """
+    table = {v: date_to_iso(v) or "" for v in s.unique()}
+    return s.map(table).astype("string[python]")
+
+
+def _lot_numbers(matches: list) -> list[int]:
+    # "2, 3 et 46" -> [2, 3, 46], sans doublons, dans l'ordre d'apparition
+    return list(dict.fromkeys(int(n) for m in matches for n in _INT.findall(m)))
+
+
+def compute_features(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Champs normalisés pour chaque ligne de `df` (colonnes SOURCE_FIELDS, chaînes)."""
+    lot_text = df["FirstSousLot"].where(df["FirstSousLot"] != "", df["SousLot"])
+    body = lot_text + "\n" + df["texte"]
+    out = pd.DataFrame(index=df.index)
+
+    prix = df["mise_a_prix"].str.replace(_NON_DIGITS, "", regex=True)
+    prix = prix.where(prix != "", body.str.extract(_PRICE_IN_TEXT)[0].str.replace(_NON_DIGITS, "", regex=True))
+    out["prix"] = pd.to_numeric(prix, errors="coerce").astype("Int64")
+
+    out["vente_iso"] = _iso_dates(df["date_vente"])
+    hour = df["date_vente"].str.extract(_HOUR)
+    out["vente_heure"] = (hour[0].str.zfill(2) + ":" + hour[1].fillna("00")).fillna("")
+    out["visite_iso"] = _iso_dates(df["date_visite"])
+
+    surface = body.str.extract(_SURFACE_TOTAL)[0].fillna(body.str.extract(_SURFACE)[0])
+    surface = surface.str.replace(r"[\s.]", "", regex=True).str.replace(",", ".", regex=False)
+    out["surface_m2"] = pd.to_numeric(surface, errors="coerce")
+
+    out["lots"] = (df["SousLot"] + "\n" + df["texte"]).str.findall(_LOTS).map(_lot_numbers)
+
+    # Occupation: d'abord dans le descriptif du lot (court), le texte complet seulement à défaut
+    occupation = lot_text.str.extract(_OCCUPATION)[0]
+    missing = occupation.isna()
+    occupation[missing] = df.loc[missing, "texte"].str.extract(_OCCUPATION)[0]
+    out["occupation"] = occupation.str.lower().str[:3].map(_OCCUPATION_LABELS).fillna("")
+
+    texte = df["texte"].str.replace(_HEADER, "", regex=True)
+    texte = texte.str.replace(_FOOTER, "", regex=True).str.replace(_NOISE_LINES, "", regex=True)
+    texte = texte.str.replace(_SPACES, " ", regex=True).str.replace(" \n", "\n", regex=False)
+    texte = texte.str.replace(_BLANK_LINES, "\n", regex=True)
+    out["texte_net"] = texte.str.strip()
+    return out
+
+
+def _signatures(df: "pd.DataFrame") -> "pd.Series":
+    # Empreinte 64 bits (hachage vectorisé pandas) des champs sources et de la version des règles
+    # hash_key: exactement 16 octets
+    hashes = pd.util.hash_pandas_object(
+        df[list(SOURCE_FIELDS)], index=False, hash_key=f"licitor-feats{FEATURES_VERSION:03d}"
+    )
+    return hashes.map("{:016x}".format)
+
+
+def _frame(records: list[dict]) -> "pd.DataFrame":
+    cols = {c: [r.get(c) or "" for r in records] for c in SOURCE_FIELDS + ("features_src",)}
+    return pd.DataFrame(cols, dtype="string[python]")
+
+
+def apply_features(records: list[dict]) -> list[dict]:
+    """Ajoute les champs normalisés aux fiches nouvelles ou modifiées (en place).
+    Retourne les fiches recalculées ([] si rien n'a changé ou si pandas est absent).
+    """
+    if pd is None:
+        print("pandas n'est pas installé: champs normalisés non calculés.")
+        return []
+    if not records:
+        return []
+    df = _frame(records)
+    signatures = _signatures(df)
+    stale = (signatures != df["features_src"]).to_numpy()
+    if not stale.any():
+        return []
+    feats = compute_features(df[stale]).astype(object)
+    feats = feats.where(feats.notna(), None)
+    feats["features_src"] = signatures[stale]
+    changed = []
+    for pos, row in zip(stale.nonzero()[0], feats.to_dict("records")):
+        rec = records[pos]
+        rec.update(row)
+        changed.append(rec)
+    return changed
@@ -0,0 +1,204 @@
+"""Géographie des annonces: géocodage hors ligne des adresses et découpage en tuiles.
+
+- Gazetteer: table locale adresse -> coordonnées, sans aucun service en ligne. Elle est alimentée par
+  un export CSV de la Base Adresse Nationale (colonnes numero, nom_voie, nom_commune, lat, lon; ex.
+  adresses-75.csv.gz) si le fichier existe, et par les annonces dont la page a une carte.
+  Recherche par adresse exacte, sinon centre de la voie, sinon centre de la commune.
+- backfill_coords() complète latitude/longitude des annonces sans carte; geo_precision indique la
+  précision obtenue ("adresse", "voie" ou "ville") et disparaît quand la page fournit ses coordonnées.
+- Tuiles: grille des tuiles web (x/y au niveau de zoom z), utilisée par output.write_geo_tiles().
+"""
+import csv
+import gzip
+import math
+import os
+import re
+import unicodedata
+
+_STREET_TYPES = {
+    "av": "avenue", "ave": "avenue", "bd": "boulevard", "bld": "boulevard", "bvd": "boulevard", "pl": "place",
+    "sq": "square", "rte": "route", "imp": "impasse", "all": "allee", "ch": "chemin", "fg": "faubourg",
+    "pas": "passage", "st": "saint", "ste": "sainte", "gal": "general", "mal": "marechal", "pdt": "president",
+}
+# "42 bis, route de Montargis", "7 et 9, rue Thomas d'Orléans", "Résidence Trévise42, rue de Fontenay"
+_ADDRESS = re.compile(
+    r"(\d+)\s*(?:bis|ter|quater)?(?:\s*(?:et|à|/|-)\s*\d+)*\s*,\s*([^\d(]+)", re.I
+)
+# Adresses collées sur le site: "rue de l'Abbaye etRue de Furstemberg" -> "rue de l'Abbaye"
+_GLUED = re.compile(r"(?<=[a-zà-ÿ.])(?=[A-ZÀ-Ý])")
+_ORDINAL = re.compile(r"\b(\d+)\s*(?:e|eme|er|ere)\b")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _fold(text: str) -> str:
+    # Minuscules sans accents, ponctuation -> espaces
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def commune_key(ville: str) -> str:
+    """"Paris 6ème" / "Paris 6e Arrondissement" -> "paris 6"; "Épinay-sur-Seine" -> "epinay sur seine"."""
+    key = _ORDINAL.sub(r"\1", _fold(ville).replace("arrondissement", ""))
+    return " ".join(key.split())
+
+
+def street_key(voie: str) -> str:
+    """"av. du Président Wilson" -> "avenue du president wilson"."""
+    return " ".join(_STREET_TYPES.get(w, w) for w in _fold(voie).split())
+
+
+def parse_address(adresse: str) -> tuple[str, str] | None:
+    """Premier "numéro, voie" de l'adresse -> (numéro, clé de voie), None si aucun."""
+    m = _ADDRESS.search(adresse or "")
+    if not m:
+        return None
+    voie = _GLUED.split(m.group(2), 1)[0]
+    voie = re.sub(r"\s+et\s*$", "", voie.strip(), flags=re.I)
+    key = street_key(voie)
+    return (m.group(1), key) if key else None
+
+
+def coords_of(record: dict) -> tuple[float, float] | None:
+    try:
+        lat, lon = float(record.get("latitude") or ""), float(record.get("longitude") or "")
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+        return None
+    return lat, lon
+
+
+class _Centroid:
+    __slots__ = ("lat", "lon", "n")
+
+    def __init__(self):
+        self.lat = self.lon = 0.0
+        self.n = 0
+
+    def add(self, lat: float, lon: float) -> None:
+        self.lat += lat
+        self.lon += lon
+        self.n += 1
+
+    def value(self) -> tuple[float, float]:
+        return self.lat / self.n, self.lon / self.n
+
+
+class Gazetteer:
+    def __init__(self):
+        self.addresses: dict[tuple[str, str, str], tuple[float, float]] = {}
+        self.streets: dict[tuple[str, str], _Centroid] = {}
+        self.communes: dict[str, _Centroid] = {}
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def add(self, commune: str, voie_key: str, numero: str, lat: float, lon: float) -> None:
+        if numero:
+            self.addresses.setdefault((commune, voie_key, numero), (lat, lon))
+        if voie_key:
+            self.streets.setdefault((commune, voie_key), _Centroid()).add(lat, lon)
+        self.communes.setdefault(commune, _Centroid()).add(lat, lon)
+
+    def load_csv(self, path: str) -> int:
+        """Charge un export BAN (séparateur ";" ou ","; .csv ou .csv.gz). Retourne le nombre de lignes lues."""
+        opener = gzip.open if path.endswith(".gz") else open
+        count = 0
+        with opener(path, "rt", encoding="utf-8", newline="") as f:
+            header = f.readline()
+            delimiter = ";" if header.count(";") > header.count(",") else ","
+            names = next(csv.reader([header], delimiter=delimiter))
+            for row in csv.DictReader(f, fieldnames=names, delimiter=delimiter):
+                try:
+                    lat, lon = float(row["lat"]), float(row["lon"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self.add(commune_key(row.get("nom_commune") or ""), street_key(row.get("nom_voie") or ""),
+                         (row.get("numero") or "").strip(), lat, lon)
+                count += 1
+        return count
+
+    def learn(self, records: list[dict]) -> None:
+        """Ajoute les annonces dont la page avait une carte (coordonnées non géocodées par nous)."""
+        for r in records:
+            coords = coords_of(r)
+            if coords is None or r.get("geo_precision"):
+                continue
+            parsed = parse_address(r.get("adresse") or "")
+            numero, voie = parsed or ("", "")
+            self.add(commune_key(r.get("ville") or ""), voie, numero, *coords)
+
+    def locate(self, ville: str, adresse: str) -> tuple[float, float, str] | None:
+        """(lat, lon, précision) de l'adresse, du centre de sa voie ou de sa commune; None si inconnue."""
+        commune = commune_key(ville)
+        if not commune:
+            return None
+        parsed = parse_address(adresse)
+        if parsed:
+            numero, voie = parsed
+            hit = self.addresses.get((commune, voie, numero))
+            if hit:
+                return hit[0], hit[1], "adresse"
+            street = self.streets.get((commune, voie))
+            if street:
+                return (*street.value(), "voie")
+        town = self.communes.get(commune)
+        if town:
+            return (*town.value(), "ville")
+        return None
+
+
+def backfill_coords(records: list[dict], gazetteer_path: str = "") -> list[dict]:
+    """Géocode les annonces sans coordonnées, et retente celles géocodées à la voie ou à la commune
+    (en place). Retourne les fiches modifiées. Le fichier BAN n'est lu que s'il reste des annonces à géocoder.
+    """
+    missing = [
+        r for r in records
+        if (coords_of(r) is None or r.get("geo_precision") in ("voie", "ville")) and (r.get("ville") or r.get("adresse"))
+    ]
+    if not missing:
+        return []
+    gaz = Gazetteer()
+    if gazetteer_path and os.path.exists(gazetteer_path):
+        try:
+            print(f"Gazetteer: {gaz.load_csv(gazetteer_path)} adresses chargées depuis {gazetteer_path}")
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            print(f"Gazetteer illisible ({gazetteer_path}) : {e}")
+    gaz.learn(records)
+    changed = []
+    for r in missing:
+        hit = gaz.locate(r.get("ville") or "", r.get("adresse") or "")
+        if hit is None:
+            continue
+        lat, lon, precision = hit
+        values = {"latitude": f"{lat:.6f}", "longitude": f"{lon:.6f}", "geo_precision": precision}
+        if any(r.get(k) != v for k, v in values.items()):
+            r.update(values)
+            changed.append(r)
+    return changed
+
+
+def tile_of(lat: float, lon: float, zoom: int) -> tuple[int, int]:
+    """Tuile web (x, y) contenant le point, au niveau de zoom `zoom`."""
+    n = 1 << zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bbox(x: int, y: int, zoom: int) -> tuple[float, float, float, float]:
+    """(sud, ouest, nord, est) de la tuile."""
+    n = 1 << zoom
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,132 @@
+"""Cache disque des réponses HTTP brutes du scraper.
+
+Chaque URL est stockée sous l'empreinte SHA-256 de l'URL: un fichier `.body` (octets bruts)
+et un fichier `.json` (statut, en-têtes utiles, encodage, date de récupération).
+- TTL: une entrée plus jeune que `ttl` secondes est servie sans réseau.
+- Au-delà, la requête est revalidée avec If-None-Match / If-Modified-Since: un 304 ne coûte pas le corps.
+- Éviction LRU par taille: la date de modification du `.body` sert de date de dernier accès.
+"""
+import hashlib
+import json
+import os
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .output import write_bytes_atomic
+
+# En-têtes conservés avec le corps (les autres ne servent pas à l'extraction)
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CacheMiss(requests.RequestException):
+    """URL absente du cache alors que le mode hors ligne interdit le réseau."""
+
+
+class HttpCache:
+    def __init__(self, root: str, ttl: float = 0.0, max_bytes: int = 200 * 1024 * 1024):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.root, digest[:2], digest)
+        return base + ".body", base + ".json"
+
+    def load(self, url: str) -> dict | None:
+        """Retourne les métadonnées (avec le corps sous la clé "body") ou None si absent/illisible."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                meta["body"] = f.read()
+        except (OSError, ValueError):
+            return None
+        # Marquer l'accès pour l'éviction LRU
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return meta
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("fetched_at", 0) <= self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        cond = {}
+        headers = entry.get("headers", {})
+        if headers.get("ETag"):
+            cond["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            cond["If-Modified-Since"] = headers["Last-Modified"]
+        return cond
+
+    def store(self, url: str, resp: requests.Response) -> None:
+        meta = {
+            "url": url,
+            "status": resp.status_code,
+            "headers": {k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers},
+            "encoding": resp.encoding,
+            "fetched_at": time.time(),
+        }
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        # Cache reconstructible: remplacement atomique sans fsync
+        write_bytes_atomic(body_path, resp.content, fsync=False)
+        write_bytes_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"), fsync=False)
+
+    def refresh(self, url: str, entry: dict, resp: requests.Response) -> None:
+        """Après un 304: repousser la date de récupération et reprendre les validateurs éventuellement renvoyés."""
+        meta = {k: v for k, v in entry.items() if k != "body"}
+        meta["fetched_at"] = time.time()
+        for k in ("ETag", "Last-Modified"):
+            if k in resp.headers:
+                meta.setdefault("headers", {})[k] = resp.headers[k]
+        _, meta_path = self._paths(url)
+        write_bytes_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"), fsync=False)
+
+    @staticmethod
+    def to_response(url: str, entry: dict) -> requests.Response:
+        resp = requests.Response()
+        resp.url = url
+        resp.status_code = entry.get("status", 200)
+        resp.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        resp.encoding = entry.get("encoding")
+        resp._content = entry["body"]
+        return resp
+
+    def evict(self) -> int:
+        """Supprime les entrées les moins récemment utilisées jusqu'à repasser sous `max_bytes`.
+        Retourne le nombre d'entrées supprimées.
+        """
+        bodies = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                # Temporaires d'écriture en cours (".tmp-*.body", atomic_open) exclus
+                if not name.endswith(".body") or name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                bodies.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        for _, size, path in sorted(bodies):
+            if total <= self.max_bytes:
+                break
+            for p in (path, path[: -len(".body")] + ".json"):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,148 @@
+"""Instrumentation d'un run du scraper: chronomètres par étape, compteurs, histogrammes de latence,
+rapport JSON de fin de run et profilage optionnel (cProfile ou pyinstrument).
+
+Les objets Metrics sont partagés par les threads (verrou interne). Les mesures faites dans les processus
+de parsing remontent avec le résultat de parse_detail() et sont ajoutées ici par le processus principal.
+"""
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .output import atomic_open
+
+# Bornes supérieures des classes d'histogramme, en millisecondes
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.n += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.n,
+            "total_s": round(self.total, 4),
+            "mean_ms": round(self.total / self.n * 1000, 3) if self.n else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": {label: c for label, c in zip(labels, self.counts) if c},
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+        self.failures: dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = Histogram()
+            hist.add(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def failure(self, where: str) -> None:
+        with self._lock:
+            self.failures[where] = self.failures.get(where, 0) + 1
+
+    def report(self, **sections) -> dict:
+        with self._lock:
+            out = {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "duration_s": round(time.perf_counter() - self.started, 3),
+                "python": platform.python_version(),
+                "argv": sys.argv[1:],
+                "stages": {k: v.as_dict() for k, v in sorted(self.stages.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "failures": dict(sorted(self.failures.items())),
+            }
+        out.update(sections)
+        return out
+
+    def write_report(self, path: str, history_path: str | None = None, **sections) -> dict:
+        """Écrit le rapport complet dans `path` et, si demandé, une ligne résumée dans `history_path` (JSON Lines)."""
+        rep = self.report(**sections)
+        # Temporaire unique (atomic_open): le démon et un run en ligne de commande peuvent écrire en même temps
+        with atomic_open(path) as f:
+            json.dump(rep, f, ensure_ascii=False, indent=2)
+        if history_path:
+            line = {
+                "started_at": rep["started_at"],
+                "duration_s": rep["duration_s"],
+                "counters": rep["counters"],
+                "failures": rep["failures"],
+                "stages_total_s": {k: v["total_s"] for k, v in rep["stages"].items()},
+            }
+            with open(history_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        return rep
+
+
+def run_profiled(func, mode: str, out_path: str):
+    """Exécute func() sous profileur. mode: "cprofile" (fichier .prof + top 25 affiché) ou "pyinstrument"
+    (rapport HTML, si le paquet est installé; sinon repli sur cProfile).
+    """
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument n'est pas installé, utilisation de cProfile.")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                return func()
+            finally:
+                profiler.stop()
+                html_path = os.path.splitext(out_path)[0] + ".html"
+                with open(html_path, "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+                print(f"Profil pyinstrument: {html_path}")
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        return func()
+    finally:
+        prof.disable()
+        prof.dump_stats(out_path)
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(25)
+        print(buf.getvalue())
+        print(f"Profil cProfile: {out_path}")
@@ -0,0 +1,230 @@
+"""Écriture des sorties du scraper.
+
+- Toute écriture passe par un fichier temporaire du même dossier puis os.replace(): un lecteur
+  (le front Next.js notamment) voit soit l'ancien fichier complet, soit le nouveau, jamais un fichier à moitié écrit.
+- Les fiches sont journalisées au fil du run en JSON Lines (une ligne par fiche, vidée à chaque écriture),
+  ce qui laisse une trace exploitable même si le run est interrompu.
+- Le JSON final est compact et sérialisé une seule fois; la seconde copie est une copie d'octets.
+- write_shards() découpe le jeu de données pour le front: un index léger (champs des cartes de la
+  page d'accueil) et un petit fichier par annonce, éventuellement pré-compressés (.gz, .br).
+- write_geo_tiles() range les annonces localisées par tuile web: la carte ne charge que les tuiles visibles.
+"""
+import csv
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from .geo import coords_of, tile_bbox, tile_of
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Champs nécessaires aux cartes de la page d'accueil (src/app/page.tsx)
+INDEX_FIELDS = (
+    "Number", "ville", "description", "mise_a_prix", "photo", "photo_thumb", "date_visite", "date_vente",
+    "adresse", "latitude", "longitude", "heading", "pitch", "fov",
+    # Champs normalisés (licitor.features) pour les filtres et le tri côté front
+    "prix", "vente_iso", "surface_m2", "occupation",
+)
+# La carte n'affiche que 3 lignes de FirstSousLot (ou du texte à défaut)
+INDEX_TEXT_MAX = 300
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w", encoding: str | None = "utf-8", newline: str | None = None,
+                fsync: bool = True):
+    """Ouvre un fichier temporaire à côté de `path`; il remplace `path` seulement si le bloc se termine sans erreur.
+    fsync=False pour les fichiers reconstructibles (cache): remplacement atomique sans attendre le disque.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+    if "b" in mode:
+        encoding = None
+    try:
+        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp crée en 0600: reprendre les droits du fichier remplacé (0644 sinon) pour rester lisible par le serveur web
+        try:
+            perms = os.stat(path).st_mode & 0o777
+        except OSError:
+            perms = 0o644
+        os.chmod(tmp, perms)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_bytes_atomic(path: str, data: bytes, fsync: bool = True) -> None:
+    with atomic_open(path, "wb", fsync=fsync) as f:
+        f.write(data)
+
+
+def write_json_atomic(path: str, records: list[dict]) -> None:
+    with atomic_open(path) as f:
+        json.dump(records, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def copy_atomic(src: str, dst: str) -> None:
+    with open(src, "rb") as fin, atomic_open(dst, "wb") as fout:
+        shutil.copyfileobj(fin, fout)
+
+
+def write_csv_atomic(path: str, records: list[dict]) -> None:
+    # Colonnes: union des clés dans l'ordre de première apparition, cellules manquantes vides
+    fieldnames = list(dict.fromkeys(k for rec in records for k in rec))
+    with atomic_open(path, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        writer.writerows(records)
+
+
+class JsonlWriter:
+    """Journal JSON Lines des fiches produites pendant le run (fichier remis à zéro à l'ouverture,
+    sauf en reprise d'un run interrompu avec append=True).
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.count = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._f = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record: dict) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False))
+        self._f.write("\n")
+        self._f.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _compact(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_if_changed(path: str, data: bytes, precompress: bool) -> bool:
+    """Écrit `path` (et ses variantes compressées) seulement si le contenu a changé."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    write_bytes_atomic(path, data)
+    if precompress:
+        write_bytes_atomic(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            write_bytes_atomic(path + ".br", brotli.compress(data))
+    return True
+
+
+def shard_name(record: dict, idx: int) -> str:
+    # Fichier détail nommé par Number; à défaut, empreinte du lien (ou de la position)
+    num = (record.get("Number") or "").strip()
+    if num.isdigit():
+        return num
+    basis = (record.get("lien") or "").strip() or f"idx:{idx}"
+    return "h" + hashlib.sha1(basis.encode("utf-8")).hexdigest()[:12]
+
+
+def index_entry(record: dict, idx: int) -> dict:
+    entry = {"id": idx, "detail": f"annonces/{shard_name(record, idx)}.json"}
+    for key in INDEX_FIELDS:
+        if key in record:
+            entry[key] = record[key]
+    # Texte de carte: FirstSousLot, ou le début du texte s'il est vide
+    first = (record.get("FirstSousLot") or "")[:INDEX_TEXT_MAX]
+    entry["FirstSousLot"] = first
+    entry["texte"] = "" if first else (record.get("texte") or "")[:INDEX_TEXT_MAX]
+    return entry
+
+
+def write_shards(out_dir: str, records: list[dict], precompress: bool = False) -> int:
+    """Écrit `out_dir/index.json` et `out_dir/annonces/<Number>.json`.
+    L'`id` de chaque entrée est la position de la fiche dans le jeu complet (identifiant utilisé par les
+    favoris et l'URL /annonce/[id]). Retourne le nombre de fichiers détail (ré)écrits.
+    """
+    details_dir = os.path.join(out_dir, "annonces")
+    os.makedirs(details_dir, exist_ok=True)
+    written = 0
+    index = []
+    for idx, record in enumerate(records):
+        entry = index_entry(record, idx)
+        index.append(entry)
+        detail_path = os.path.join(out_dir, entry["detail"])
+        if _write_if_changed(detail_path, _compact(dict(record, id=idx)), precompress):
+            written += 1
+    _write_if_changed(os.path.join(out_dir, "index.json"), _compact(index), precompress)
+    return written
+
+
+# Champs d'un point de carte dans une tuile (le détail reste dans annonces/<Number>.json)
+GEO_FIELDS = ("ville", "mise_a_prix", "prix", "vente_iso", "geo_precision")
+
+
+def write_geo_tiles(out_dir: str, records: list[dict], zoom: int = 13, precompress: bool = False) -> int:
+    """Écrit `out_dir/index.json` (tuiles non vides avec leur emprise, emprise de chaque ville) et
+    `out_dir/<zoom>/<x>-<y>.json` (points de la tuile). Les ids sont ceux de write_shards().
+    Les tuiles devenues vides sont supprimées. Retourne le nombre de tuiles (ré)écrites.
+    """
+    tiles: dict[tuple[int, int], list[dict]] = {}
+    villes: dict[str, list[float]] = {}
+    for idx, record in enumerate(records):
+        coords = coords_of(record)
+        if coords is None:
+            continue
+        lat, lon = coords
+        point = {"id": idx, "lat": lat, "lon": lon, "detail": f"annonces/{shard_name(record, idx)}.json"}
+        point.update((k, record[k]) for k in GEO_FIELDS if record.get(k) is not None)
+        tiles.setdefault(tile_of(lat, lon, zoom), []).append(point)
+        ville = record.get("ville") or ""
+        if ville:
+            # [nombre, sud, ouest, nord, est]
+            box = villes.setdefault(ville, [0, lat, lon, lat, lon])
+            box[0] += 1
+            box[1], box[2], box[3], box[4] = min(box[1], lat), min(box[2], lon), max(box[3], lat), max(box[4], lon)
+
+    tiles_dir = os.path.join(out_dir, str(zoom))
+    os.makedirs(tiles_dir, exist_ok=True)
+    written = 0
+    index = {"zoom": zoom, "tiles": [], "villes": {}}
+    keep = set()
+    for (x, y), points in sorted(tiles.items()):
+        name = f"{x}-{y}.json"
+        keep.add(name)
+        if _write_if_changed(os.path.join(tiles_dir, name), _compact(points), precompress):
+            written += 1
+        south, west, north, east = tile_bbox(x, y, zoom)
+        index["tiles"].append({
+            "file": f"{zoom}/{name}", "x": x, "y": y, "count": len(points),
+            "bbox": [round(south, 6), round(west, 6), round(north, 6), round(east, 6)],
+        })
+    for ville, (count, *bbox) in sorted(villes.items()):
+        index["villes"][ville] = {"count": count, "bbox": bbox}
+    for name in os.listdir(tiles_dir):
+        base = name.split(".json")[0] + ".json"
+        if base not in keep:
+            os.remove(os.path.join(tiles_dir, name))
+    _write_if_changed(os.path.join(out_dir, "index.json"), _compact(index), precompress)
+    return written
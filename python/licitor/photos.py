@@ -0,0 +1,205 @@
+"""Pipeline de téléchargement des photos, en arrière-plan du scraping.
+
+- submit(url) rend immédiatement un Future; le téléchargement tourne dans un pool de threads dédié,
+  le parsing des pages détail ne l'attend jamais.
+- Le corps est lu en flux (iter_content) vers un fichier temporaire, haché en SHA-256 au passage.
+- Déduplication par contenu: un fichier identique déjà présent sous un autre nom est réutilisé (lien physique).
+- Re-téléchargement conditionnel: au-delà de `max_age_days`, requête avec If-None-Match / If-Modified-Since.
+- Miniatures WebP (Pillow, optionnel) nommées par empreinte du contenu, donc dédupliquées elles aussi.
+  Elles sont écrites dans un dossier servi par le front (public/thumbs) et la fiche reçoit leur chemin web.
+L'état (empreinte, validateurs HTTP, date) est conservé dans Pictures/.manifest.json.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+from urllib.parse import urlparse
+
+import requests
+
+from .output import atomic_open, write_bytes_atomic
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_CHUNK = 64 * 1024
+
+
+class PhotoPipeline:
+    def __init__(self, pictures_dir: str, fetch: Callable[[str, dict], requests.Response], workers: int = 4,
+                 thumb_width: int = 480, max_age_days: float = 30.0, offline: bool = False, metrics=None,
+                 thumbs_dir: str = "", thumbs_url: str = ""):
+        """`fetch(url, headers)` doit renvoyer une réponse ouverte en stream=True.
+
+        Miniatures dans `thumbs_dir` (défaut: <pictures_dir>/thumbs); avec `thumbs_url` ("/thumbs"),
+        la fiche reçoit le chemin web de la miniature plutôt que son chemin local.
+        """
+        self.pictures_dir = pictures_dir
+        self.thumbs_dir = thumbs_dir or os.path.join(pictures_dir, "thumbs")
+        self.thumbs_url = thumbs_url.rstrip("/")
+        self.fetch = fetch
+        self.thumb_width = thumb_width
+        self.max_age = max_age_days * 86400
+        self.offline = offline
+        self.metrics = metrics
+        self._manifest_path = os.path.join(pictures_dir, ".manifest.json")
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="photos")
+        self.stats = {"downloaded": 0, "not_modified": 0, "reused": 0, "deduplicated": 0, "failed": 0, "bytes": 0}
+        os.makedirs(pictures_dir, exist_ok=True)
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        self._by_hash = {m["sha256"]: name for name, m in self.manifest.items() if m.get("sha256")}
+
+    def submit(self, photo_url: str) -> Future:
+        """Future de (chemin local, chemin miniature); (url d'origine, "") si le téléchargement échoue."""
+        with self._lock:
+            fut = self._futures.get(photo_url)
+            if fut is None:
+                fut = self._pool.submit(self._process, photo_url)
+                self._futures[photo_url] = fut
+            return fut
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            data = json.dumps(self.manifest, ensure_ascii=False, indent=1).encode("utf-8")
+        write_bytes_atomic(self._manifest_path, data)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def _process(self, photo_url: str) -> tuple[str, str]:
+        if self.metrics is None:
+            return self._download(photo_url)
+        with self.metrics.timer("photo_download"):
+            return self._download(photo_url)
+
+    def _download(self, photo_url: str) -> tuple[str, str]:
+        # Nom du fichier à partir de l'URL
+        filename = os.path.basename(urlparse(photo_url).path)
+        local_path = os.path.join(self.pictures_dir, filename)
+        try:
+            with self._lock:
+                meta = dict(self.manifest.get(filename) or {})
+            exists = os.path.exists(local_path)
+            if exists and (self.offline or not meta or time.time() - meta.get("fetched_at", 0) <= self.max_age):
+                self._count("reused")
+                if not meta.get("sha256"):
+                    meta = {"sha256": _file_sha256(local_path), "fetched_at": time.time()}
+                    self._register(filename, meta)
+                return local_path, self._thumbnail(local_path, meta["sha256"])
+            if self.offline:
+                raise FileNotFoundError(f"photo absente (mode hors ligne): {filename}")
+            cond = {}
+            if exists:
+                if meta.get("etag"):
+                    cond["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    cond["If-Modified-Since"] = meta["last_modified"]
+            with self.fetch(photo_url, cond) as resp:
+                if exists and resp.status_code == 304:
+                    self._count("not_modified")
+                    meta["fetched_at"] = time.time()
+                    self._register(filename, meta)
+                    return local_path, self._thumbnail(local_path, meta["sha256"])
+                resp.raise_for_status()
+                sha, size = self._stream_to(resp, local_path)
+                meta = {
+                    "sha256": sha,
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                    "size": size,
+                }
+            self._count("downloaded")
+            self._count("bytes", size)
+            self._register(filename, meta)
+            return local_path, self._thumbnail(local_path, sha)
+        except Exception as e:
+            print(f"Erreur téléchargement photo {photo_url} : {e}")
+            self._count("failed")
+            return photo_url, ""
+
+    def _stream_to(self, resp: requests.Response, local_path: str) -> tuple[str, int]:
+        """Écrit le corps en flux dans un temporaire puis le met en place; réutilise un fichier de même contenu."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.pictures_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in resp.iter_content(_CHUNK):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            os.chmod(tmp, 0o644)  # mkstemp crée en 0600
+            sha = digest.hexdigest()
+            with self._lock:
+                twin = self._by_hash.get(sha)
+            twin_path = os.path.join(self.pictures_dir, twin) if twin else None
+            if twin_path and twin_path != local_path and os.path.exists(twin_path):
+                # Même image sous un autre nom: lien physique plutôt qu'une seconde copie
+                try:
+                    os.remove(tmp)
+                    tmp = tmp + ".lnk"
+                    os.link(twin_path, tmp)
+                    self._count("deduplicated")
+                except OSError:
+                    with open(tmp, "wb") as f, open(twin_path, "rb") as src:
+                        f.write(src.read())
+            os.replace(tmp, local_path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return sha, size
+
+    def _register(self, filename: str, meta: dict) -> None:
+        with self._lock:
+            self.manifest[filename] = meta
+            if meta.get("sha256"):
+                self._by_hash.setdefault(meta["sha256"], filename)
+
+    def _thumbnail(self, local_path: str, sha: str) -> str:
+        """Miniature WebP (largeur `thumb_width`) nommée par empreinte; "" si Pillow est absent ou l'image illisible."""
+        if Image is None or not sha:
+            return ""
+        name = sha[:20] + ".webp"
+        thumb_path = os.path.join(self.thumbs_dir, name)
+        ref = f"{self.thumbs_url}/{name}" if self.thumbs_url else thumb_path
+        if os.path.exists(thumb_path):
+            return ref
+        try:
+            with Image.open(local_path) as img:
+                img.draft("RGB", (self.thumb_width, self.thumb_width))  # décodage JPEG réduit
+                img.thumbnail((self.thumb_width, self.thumb_width * 4))
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGB")
+                # Miniature reconstructible depuis la photo: sans fsync
+                with atomic_open(thumb_path, "wb", fsync=False) as f:
+                    img.save(f, "WEBP", quality=80, method=4)
+            return ref
+        except Exception as e:
+            print(f"Miniature impossible pour {local_path} : {e}")
+            return ""
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,309 @@
+"""Stockage SQLite des annonces.
+
+Une ligne par annonce, clé = _key_for() du scraper (NUM:<Number>, sinon URL:<lien>), avec colonnes
+indexées pour les requêtes (ville, prix numérique, date de vente ISO) et la fiche complète en JSON.
+Chaque changement de prix ou de date de vente ajoute une ligne dans listing_history.
+
+La base est en mode WAL: le front ou une route API peut la lire pendant qu'un run écrit.
+Les écritures sont groupées en transactions (upsert_many), et seules les fiches modifiées sont réécrites.
+
+Index spatial: listings_geo (R-tree SQLite, id = position de l'annonce) est tenu à jour à chaque écriture;
+within_bbox() et nearest() l'interrogent sans parcourir les fiches. Sans le module R-tree, une table
+ordinaire indexée prend le relais avec les mêmes requêtes.
+"""
+import json
+import math
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+
+from .geo import coords_of, haversine_km
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    key         TEXT PRIMARY KEY,
+    position    INTEGER NOT NULL,
+    number      TEXT,
+    lien        TEXT,
+    ville       TEXT,
+    mise_a_prix TEXT,
+    prix        INTEGER,
+    date_vente  TEXT,
+    vente_iso   TEXT,
+    data        TEXT NOT NULL,
+    first_seen  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS listings_position ON listings(position);
+CREATE INDEX IF NOT EXISTS listings_number ON listings(number);
+CREATE INDEX IF NOT EXISTS listings_lien ON listings(lien);
+CREATE INDEX IF NOT EXISTS listings_ville ON listings(ville);
+CREATE INDEX IF NOT EXISTS listings_prix ON listings(prix);
+CREATE INDEX IF NOT EXISTS listings_vente ON listings(vente_iso);
+CREATE TABLE IF NOT EXISTS listing_history (
+    key         TEXT NOT NULL REFERENCES listings(key),
+    observed_at TEXT NOT NULL,
+    mise_a_prix TEXT,
+    prix        INTEGER,
+    date_vente  TEXT,
+    vente_iso   TEXT
+);
+CREATE INDEX IF NOT EXISTS listing_history_key ON listing_history(key, observed_at);
+"""
+
+_GEO_RTREE = "CREATE VIRTUAL TABLE IF NOT EXISTS listings_geo USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+_GEO_TABLE = """
+CREATE TABLE IF NOT EXISTS listings_geo (
+    id INTEGER PRIMARY KEY, min_lat REAL, max_lat REAL, min_lon REAL, max_lon REAL
+);
+CREATE INDEX IF NOT EXISTS listings_geo_lat_lon ON listings_geo(min_lat, min_lon);
+"""
+# 1 degré de latitude ~ 111,2 km
+_KM_PER_DEG = 111.195
+
+_MONTHS = {
+    "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6, "juillet": 7,
+    "août": 8, "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11, "décembre": 12, "decembre": 12,
+}
+_DATE_TXT_RE = re.compile(r"(\d{1,2})(?:er)?\s+([a-zéûôàèùç]+)\s+(\d{4})", re.I)
+_DATE_NUM_RE = re.compile(r"(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{4})")
+
+
+def price_to_int(raw: str) -> int | None:
+    digits = re.sub(r"[^\d]", "", raw or "")
+    return int(digits) if digits else None
+
+
+def date_to_iso(raw: str) -> str | None:
+    """"jeudi 9 octobre 2025 à 14h" -> "2025-10-09" (None si non reconnu)."""
+    if not raw:
+        return None
+    m = _DATE_TXT_RE.search(raw)
+    if m and m.group(2).lower() in _MONTHS:
+        day, month, year = int(m.group(1)), _MONTHS[m.group(2).lower()], int(m.group(3))
+    else:
+        m = _DATE_NUM_RE.search(raw)
+        if not m:
+            return None
+        day, month, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    try:
+        return datetime(year, month, day).date().isoformat()
+    except ValueError:
+        return None
+
+
+class ListingStore:
+    def __init__(self, path: str, key_for: Callable[[dict], str]):
+        self.path = path
+        self.key_for = key_for
+        # Connexion partagée entre threads (recherches des crawls de régions parallèles), accès sérialisés
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        try:
+            self.conn.execute(_GEO_RTREE)
+        except sqlite3.OperationalError:
+            self.conn.executescript(_GEO_TABLE)
+        # Base créée avant l'index spatial: le construire une fois
+        if self.count() and not self.conn.execute("SELECT COUNT(*) FROM listings_geo").fetchone()[0]:
+            self.reindex_geo()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM listings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert_many(self, items: Iterable[dict], merge: Callable[[dict, dict], dict], observed_at: str | None = None) -> dict:
+        """Fusionne `items` dans la base en une transaction: insertion si la clé est nouvelle, sinon
+        merge(fiche stockée, nouvelle fiche), réécrite seulement si elle a changé.
+        Retourne les compteurs {"inserted", "updated", "unchanged"}.
+        """
+        now = observed_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        with self._lock, self.conn:
+            next_pos = self.conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM listings").fetchone()[0]
+            for it in items:
+                key = self.key_for(it)
+                row = self.conn.execute(
+                    "SELECT data, mise_a_prix, date_vente, position FROM listings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self._insert(key, next_pos, it, now)
+                    self._history(key, it, now)
+                    next_pos += 1
+                    stats["inserted"] += 1
+                    continue
+                base = json.loads(row[0])
+                out = merge(base, it)
+                if out == base:
+                    stats["unchanged"] += 1
+                    continue
+                self._update(key, out, now)
+                self._index_geo(row[3], out)
+                if (out.get("mise_a_prix") or "") != (row[1] or "") or (out.get("date_vente") or "") != (row[2] or ""):
+                    self._history(key, out, now)
+                stats["updated"] += 1
+        return stats
+
+    def _columns(self, it: dict) -> tuple:
+        return (
+            (it.get("Number") or "").strip() or None,
+            (it.get("lien") or "").strip() or None,
+            it.get("ville") or None,
+            it.get("mise_a_prix") or None,
+            price_to_int(it.get("mise_a_prix", "")),
+            it.get("date_vente") or None,
+            date_to_iso(it.get("date_vente", "")),
+            json.dumps(it, ensure_ascii=False),
+        )
+
+    def _insert(self, key: str, position: int, it: dict, now: str) -> None:
+        self.conn.execute(
+            "INSERT INTO listings (key, position, number, lien, ville, mise_a_prix, prix, date_vente, vente_iso, data,"
+            " first_seen, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, position, *self._columns(it), now, now),
+        )
+        self._index_geo(position, it)
+
+    def _update(self, key: str, it: dict, now: str) -> None:
+        self.conn.execute(
+            "UPDATE listings SET number = ?, lien = ?, ville = ?, mise_a_prix = ?, prix = ?, date_vente = ?,"
+            " vente_iso = ?, data = ?, updated_at = ? WHERE key = ?",
+            (*self._columns(it), now, key),
+        )
+
+    def _history(self, key: str, it: dict, now: str) -> None:
+        self.conn.execute(
+            "INSERT INTO listing_history (key, observed_at, mise_a_prix, prix, date_vente, vente_iso)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, now, it.get("mise_a_prix") or None, price_to_int(it.get("mise_a_prix", "")),
+             it.get("date_vente") or None, date_to_iso(it.get("date_vente", ""))),
+        )
+
+    def set_data(self, items: Iterable[dict]) -> int:
+        """Réécrit la fiche JSON de fiches existantes (champs dérivés ajoutés hors crawl), en une transaction,
+        sans toucher à updated_at ni à l'historique.
+        """
+        count = 0
+        with self._lock, self.conn:
+            for it in items:
+                key = self.key_for(it)
+                self.conn.execute("UPDATE listings SET data = ? WHERE key = ?", (json.dumps(it, ensure_ascii=False), key))
+                row = self.conn.execute("SELECT position FROM listings WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._index_geo(row[0], it)
+                count += 1
+        return count
+
+    def _index_geo(self, position: int, it: dict) -> None:
+        coords = coords_of(it)
+        if coords is None:
+            self.conn.execute("DELETE FROM listings_geo WHERE id = ?", (position,))
+        else:
+            lat, lon = coords
+            self.conn.execute("INSERT OR REPLACE INTO listings_geo VALUES (?, ?, ?, ?, ?)", (position, lat, lat, lon, lon))
+
+    def reindex_geo(self) -> int:
+        """Reconstruit l'index spatial depuis les fiches. Retourne le nombre d'annonces localisées."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM listings_geo")
+            for position, data in self.conn.execute("SELECT position, data FROM listings").fetchall():
+                self._index_geo(position, json.loads(data))
+            return self.conn.execute("SELECT COUNT(*) FROM listings_geo").fetchone()[0]
+
+    def within_bbox(self, south: float, west: float, north: float, east: float, limit: int | None = None) -> list[dict]:
+        """Annonces dont les coordonnées sont dans le rectangle (degrés), dans l'ordre d'insertion."""
+        sql = (
+            "SELECT l.data FROM listings_geo g JOIN listings l ON l.position = g.id"
+            " WHERE g.min_lat >= ? AND g.max_lat <= ? AND g.min_lon >= ? AND g.max_lon <= ? ORDER BY g.id"
+        )
+        params: list = [south, north, west, east]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def nearest(self, lat: float, lon: float, k: int = 1, max_km: float = 50.0) -> list[tuple[float, dict]]:
+        """Les `k` annonces les plus proches du point, [(distance en km, fiche)], dans un rayon de `max_km`.
+        Fenêtre de recherche doublée jusqu'à contenir k annonces à moins de son demi-côté.
+        """
+        radius = 0.5
+        while True:
+            radius = min(radius, max_km)
+            dlat = radius / _KM_PER_DEG
+            dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT id, min_lat, min_lon FROM listings_geo"
+                    " WHERE min_lat >= ? AND max_lat <= ? AND min_lon >= ? AND max_lon <= ?",
+                    (lat - dlat, lat + dlat, lon - dlon, lon + dlon),
+                ).fetchall()
+            found = sorted((haversine_km(lat, lon, plat, plon), pos) for pos, plat, plon in rows)
+            found = [(d, pos) for d, pos in found if d <= radius]
+            if len(found) >= k or radius >= max_km:
+                break
+            radius *= 2
+        out = []
+        with self._lock:
+            for dist, pos in found[:k]:
+                row = self.conn.execute("SELECT data FROM listings WHERE position = ?", (pos,)).fetchone()
+                out.append((round(dist, 3), json.loads(row[0])))
+        return out
+
+    def all(self) -> list[dict]:
+        """Toutes les fiches dans l'ordre d'insertion (la position sert d'identifiant côté front)."""
+        with self._lock:
+            rows = self.conn.execute("SELECT data FROM listings ORDER BY position").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def query(self, ville: str | None = None, prix_min: int | None = None, prix_max: int | None = None,
+              vente_after: str | None = None, vente_before: str | None = None, limit: int | None = None) -> list[dict]:
+        """Recherche indexée: ville exacte, fourchette de prix, fourchette de dates de vente (ISO)."""
+        clauses, params = [], []
+        if ville:
+            clauses.append("ville = ?")
+            params.append(ville)
+        if prix_min is not None:
+            clauses.append("prix >= ?")
+            params.append(prix_min)
+        if prix_max is not None:
+            clauses.append("prix <= ?")
+            params.append(prix_max)
+        if vente_after:
+            clauses.append("vente_iso >= ?")
+            params.append(vente_after)
+        if vente_before:
+            clauses.append("vente_iso <= ?")
+            params.append(vente_before)
+        sql = "SELECT data FROM listings"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY position"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def history(self, key: str) -> list[dict]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT observed_at, mise_a_prix, prix, date_vente, vente_iso FROM listing_history"
+                " WHERE key = ? ORDER BY observed_at", (key,)
+            ).fetchall()
+        return [dict(zip(("observed_at", "mise_a_prix", "prix", "date_vente", "vente_iso"), r)) for r in rows]
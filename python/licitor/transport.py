@@ -0,0 +1,186 @@
+"""Transport HTTP du scraper: session partagée, politesse par hôte, cache disque et statistiques."""
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import HEADERS, ScrapeConfig
+from .http_cache import CacheMiss, HttpCache
+from .metrics import Metrics
+
+
+class _HostLimiter:
+    """Limite par hôte le nombre de requêtes en vol et espace leurs départs d'au moins `min_interval` secondes.
+    Remplace l'ancienne pause fixe time.sleep(1) entre deux pages de liste.
+    """
+
+    def __init__(self, max_parallel: int, min_interval: float, metrics: Metrics | None = None):
+        self.max_parallel = max_parallel
+        self.min_interval = min_interval
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._sems: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlparse(url).netloc
+        waited_from = time.perf_counter()
+        with self._lock:
+            sem = self._sems.setdefault(host, threading.BoundedSemaphore(self.max_parallel))
+        with sem:
+            # Réserver le prochain créneau de départ pour cet hôte
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.min_interval
+            delay = start - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if self.metrics is not None:
+                # Attente de politesse (créneau libre + délai minimal), équivalent de l'ancien time.sleep(1)
+                self.metrics.observe("politeness_wait", time.perf_counter() - waited_from)
+            yield
+
+
+class _HttpStats:
+    """Compteurs partagés par les threads: requêtes, relances, erreurs et latences par hôte."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts: dict[str, dict] = {}
+
+    def record(self, url: str, elapsed: float, retries: int = 0, error: bool = False):
+        host = urlparse(url).netloc
+        with self._lock:
+            h = self._host(host)
+            h["requests"] += 1
+            h["retries"] += retries
+            h["errors"] += int(error)
+            h["latencies"].append(elapsed)
+
+    def record_cache(self, url: str, kind: str):
+        # kind: "cache_hits" (servi sans réseau) ou "not_modified" (revalidé par 304)
+        with self._lock:
+            self._host(urlparse(url).netloc)[kind] += 1
+
+    def _host(self, host: str) -> dict:
+        return self.hosts.setdefault(
+            host, {"requests": 0, "retries": 0, "errors": 0, "cache_hits": 0, "not_modified": 0, "latencies": []}
+        )
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                host: {k: (round(sum(v), 3) if k == "latencies" else v) for k, v in h.items()}
+                for host, h in sorted(self.hosts.items())
+            }
+
+    def summary(self) -> str:
+        lines = []
+        with self._lock:
+            for host, h in sorted(self.hosts.items()):
+                lat = sorted(h["latencies"])
+                if not lat:
+                    if h["cache_hits"]:
+                        lines.append(f"  {host}: {h['cache_hits']} réponses servies par le cache")
+                    continue
+                p50 = lat[len(lat) // 2]
+                p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+                lines.append(
+                    f"  {host}: {h['requests']} requêtes, {h['retries']} relances, {h['errors']} erreurs, "
+                    f"latence moy {sum(lat) / len(lat):.3f}s p50 {p50:.3f}s p95 {p95:.3f}s total {sum(lat):.1f}s, "
+                    f"cache {h['cache_hits']} hits / {h['not_modified']} 304"
+                )
+        return "\n".join(lines)
+
+
+def _make_session(config: ScrapeConfig) -> requests.Session:
+    """Session unique pour tout le run: connexions keep-alive réutilisées (pas de nouvelle poignée de main
+    TCP+TLS par requête) et relances avec backoff exponentiel sur 429/5xx, en respectant Retry-After.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(
+        total=config.retries,
+        backoff_factor=config.backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.effective_pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HttpClient:
+    """Regroupe la session, le limiteur par hôte, le cache disque et les statistiques d'un run."""
+
+    def __init__(self, config: ScrapeConfig, metrics: Metrics, limiter: _HostLimiter | None = None):
+        self.config = config
+        self.metrics = metrics
+        self.offline = config.offline
+        self.limiter = limiter or _HostLimiter(config.host_max_parallel, config.host_min_interval, metrics)
+        self.session = _make_session(config)
+        self.stats = _HttpStats()
+        self.cache = (
+            HttpCache(config.cache_dir, ttl=config.cache_ttl, max_bytes=config.cache_max_mb * 1024 * 1024)
+            if config.cache or config.offline else None
+        )
+
+    def _send(self, url: str, **kwargs) -> requests.Response:
+        with self.limiter.slot(url):
+            start = time.perf_counter()
+            try:
+                resp = self.session.get(url, timeout=15, **kwargs)
+            except Exception:
+                self.stats.record(url, time.perf_counter() - start, error=True)
+                raise
+        elapsed = time.perf_counter() - start
+        history = getattr(getattr(resp.raw, "retries", None), "history", None) or ()
+        self.stats.record(url, elapsed, retries=len(history), error=resp.status_code >= 400)
+        self.metrics.observe(f"http:{urlparse(url).netloc}", elapsed)
+        self.metrics.incr("http_requests")
+        self.metrics.incr("http_retries", len(history))
+        return resp
+
+    def photo_get(self, url: str, cond: dict) -> requests.Response:
+        """GET en flux pour les photos (corps lu par le pipeline photo, hors du créneau de politesse)."""
+        return self._send(url, headers=cond, stream=True)
+
+    def get(self, url: str, cache: bool = True) -> requests.Response:
+        """GET via la session partagée. Avec cache: réponse fraîche servie du disque, sinon requête
+        conditionnelle (304 => corps repris du cache). En mode hors ligne, seul le cache est consulté.
+        """
+        http_cache = self.cache
+        entry = http_cache.load(url) if cache and http_cache else None
+        if entry and (self.offline or http_cache.is_fresh(entry)):
+            self.stats.record_cache(url, "cache_hits")
+            self.metrics.incr("cache_hits")
+            return HttpCache.to_response(url, entry)
+        if self.offline:
+            raise CacheMiss(f"absent du cache (mode hors ligne): {url}")
+        cond = HttpCache.conditional_headers(entry) if entry else {}
+        resp = self._send(url, headers=cond)
+        self.metrics.incr("bytes_downloaded", len(resp.content))
+        if entry and resp.status_code == 304:
+            self.stats.record_cache(url, "not_modified")
+            self.metrics.incr("cache_not_modified")
+            http_cache.refresh(url, entry, resp)
+            return HttpCache.to_response(url, entry)
+        if cache and http_cache and resp.status_code == 200:
+            http_cache.store(url, resp)
+        return resp
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache and not self.offline:
+            evicted = self.cache.evict()
+            if evicted:
+                print(f"Cache HTTP: {evicted} entrées évincées (limite {self.config.cache_max_mb} Mo).")
@@ -0,0 +1,90 @@
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+# Le paquet licitor et les scripts vivent dans python/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from licitor.config import ScrapeConfig  # noqa: E402
+from licitor.transport import _HttpStats  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, url: str, text: str, status_code: int = 200):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code} {self.url}")
+
+
+class FakeSite:
+    """Site Licitor en mémoire: `per_page` annonces par page de liste, prix modifiables par numéro.
+    Se branche à la place de HttpClient (Crawler(config, client=site)).
+    """
+
+    def __init__(self, per_page: int = 3):
+        self.per_page = per_page
+        self.prices: dict[int, str] = {}
+        self.cache = None
+        self.stats = _HttpStats()
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def numbers(self, region: str, page: int) -> list[int]:
+        base = 100000 + (sum(map(ord, region)) % 100) * 1000 + page * 10
+        return [base + k for k in range(self.per_page)]
+
+    def price(self, number: int) -> str:
+        return self.prices.get(number, f"{number} €")
+
+    def listing(self, region: str, page: int) -> str:
+        cards = "".join(
+            f'<li><a class="Ad" href="/annonce/{region}/{n}.html"><span class="City">Paris</span>'
+            f'<span class="Name">Un appartement</span><span class="Text">Lot {n}</span>'
+            f'<span class="PriceNumber">{self.price(n)}</span></a></li>'
+            for n in self.numbers(region, page)
+        )
+        return f'<html><body><ul class="AdResults">{cards}</ul></body></html>'
+
+    def detail(self, number: int) -> str:
+        return (
+            f'<html><body><div class="Street">{number % 90 + 1}, rue de Rivoli</div>'
+            f'<p class="Date">jeudi 9 octobre 2025 à 14h</p><div class="Court">Tribunal Judiciaire de Paris</div>'
+            f'<div class="Text">Description longue {number}</div></body></html>'
+        )
+
+    def get(self, url: str, cache: bool = True) -> FakeResponse:
+        with self._lock:
+            self.calls.append(url)
+        m = re.search(r"/ventes-aux-encheres-immobilieres/([^/]+)/.*[?&]p=(\d+)", url)
+        if m:
+            return FakeResponse(url, self.listing(m.group(1), int(m.group(2))))
+        return FakeResponse(url, self.detail(int(re.search(r"/(\d+)\.html", url).group(1))))
+
+    def detail_calls(self) -> list[str]:
+        return [u for u in self.calls if "/annonce/" in u]
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def site():
+    return FakeSite()
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Configuration hors réseau: pas de photos, de clavier ni de pool de processus, sorties dans tmp_path."""
+    return ScrapeConfig(
+        pages=2, concurrency=2, parse_workers=0, photos=False, keyboard=False, incremental=False, cache=False,
+        data_dir=str(tmp_path), public_dir=str(tmp_path / "public"), store_path=str(tmp_path / "listings.db"),
+        checkpoint_path=str(tmp_path / "checkpoint.json"), report_path=str(tmp_path / "report.json"),
+        history_path=str(tmp_path / "reports.jsonl"), gazetteer_path="", regions=[],
+    )
@@ -0,0 +1,17 @@
+import pytest
+
+from licitor.config import ScrapeConfig, config_from_argv
+
+
+def test_cli_values_are_clamped_like_environment(monkeypatch):
+    monkeypatch.setenv("MAX_PAGE", "0")
+    monkeypatch.setenv("CONCURRENCY", "0")
+    env = ScrapeConfig()
+    cli = config_from_argv(["--pages", "0", "--concurrency", "0", "--thumb-width", "3", "--host-delay", "-1"])
+    assert (env.pages, env.concurrency) == (1, 1)
+    assert (cli.pages, cli.concurrency, cli.thumb_width, cli.host_min_interval) == (1, 1, 16, 0.0)
+
+
+def test_cli_rejects_non_numbers():
+    with pytest.raises(SystemExit):
+        config_from_argv(["--pages", "beaucoup"])
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("pdfplumber")
+
+from bench.bench_debit import VARIANTES, ecrire_pdf, releve_synthetique  # noqa: E402
+from debit_gui import _montants_ligne, extraire_debits  # noqa: E402
+
+
+@pytest.mark.parametrize("variante", sorted(VARIANTES))
+def test_totaux_exacts_par_position(tmp_path, variante):
+    entete_partout, milliers, corps = VARIANTES[variante]
+    contenu, vrai_d, vrai_c = releve_synthetique(3, lignes=12, entete_partout=entete_partout, milliers=milliers,
+                                                 corps_libelle=corps)
+    chemin = str(tmp_path / "releve.pdf")
+    ecrire_pdf(chemin, contenu)
+    debits, credits = extraire_debits(chemin)
+    assert sum(debits) == pytest.approx(vrai_d)
+    assert sum(credits) == pytest.approx(vrai_c)
+
+
+def _ligne(*mots):
+    # (texte, x0): 5 pt par caractère
+    return [{"text": t, "x0": x, "x1": x + 5 * len(t), "top": 0} for t, x in mots]
+
+
+def test_montants_ligne_milliers_et_bord_droit():
+    ligne = _ligne(("11.06", 40), ("1", 380), ("234", 387), ("567,89", 405), ("1.234,56", 500))
+    assert _montants_ligne(ligne) == [(435, 1234567.89), (540, 1234.56)]
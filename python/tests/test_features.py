@@ -0,0 +1,20 @@
+import pytest
+
+from licitor.store import date_to_iso
+
+features = pytest.importorskip("licitor.features")
+pytest.importorskip("pandas")
+
+DATES = ["jeudi 9 octobre 2025 à 14h", "Lundi 1er Septembre 2025", "09/10/2025", "31 février 2025",
+         "le 3 MARS 2026 à 10h30", "mardi 2 décembre 2025", ""]
+
+
+def test_vente_iso_agrees_with_store():
+    records = [{"date_vente": d, "mise_a_prix": "100 000 €"} for d in DATES]
+    changed = features.apply_features(records)
+    assert len(changed) == len(DATES)
+    assert [r["vente_iso"] for r in records] == [date_to_iso(d) or "" for d in DATES]
+    assert records[0]["vente_heure"] == "14:00"
+    assert records[0]["prix"] == 100000
+    # Empreintes à jour: rien à recalculer
+    assert features.apply_features(records) == []
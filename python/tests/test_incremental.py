@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+from licitor.crawler import Crawler, _key_for, _merge_record
+from licitor.store import ListingStore
+
+
+def _crawl(config, site, store, since=None, scraped_at=""):
+    with Crawler(config, client=site) as crawler:
+        items = list(crawler.iter_records(lookup=store.get, since=since, scraped_at=scraped_at))
+    store.upsert_many(items, _merge_record, scraped_at or None)
+    return crawler, items
+
+
+def test_changed_card_is_refetched_and_stored(config, site):
+    config = config.with_options(pages=1)
+    store = ListingStore(config.store_path, _key_for)
+    try:
+        first = datetime.now(timezone.utc) - timedelta(days=1)
+        _crawl(config, site, store, scraped_at=first.isoformat(timespec="seconds"))
+        number = site.numbers("paris-et-ile-de-france", 1)[0]
+        key = f"NUM:{number}"
+        old = store.get(key)
+
+        # Baisse de la mise à prix: la carte change, seule cette fiche est re-téléchargée
+        site.prices[number] = "80 000 €"
+        site.calls.clear()
+        since = datetime.now(timezone.utc) - timedelta(days=7)
+        crawler, items = _crawl(config, site, store, since=since,
+                                scraped_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        assert [it["Number"] for it in items] == [str(number)]
+        assert crawler.skipped == site.per_page - 1
+        stored = store.get(key)
+        assert stored["mise_a_prix"] == "80 000 €"
+        assert stored["card_fingerprint"] != old["card_fingerprint"]
+        assert [h["prix"] for h in store.history(key)] == [number, 80000]
+
+        # Passage suivant: fiche à jour (empreinte et prix stockés ensemble), rien n'est re-téléchargé
+        site.calls.clear()
+        crawler, items = _crawl(config, site, store, since=since)
+        assert items == []
+        assert site.detail_calls() == []
+        assert store.get(key)["mise_a_prix"] == "80 000 €"
+    finally:
+        store.close()
+
+
+def test_stale_listing_is_refetched(config, site):
+    config = config.with_options(pages=1)
+    store = ListingStore(config.store_path, _key_for)
+    try:
+        old = datetime.now(timezone.utc) - timedelta(days=30)
+        _crawl(config, site, store, scraped_at=old.isoformat(timespec="seconds"))
+        site.calls.clear()
+        _, items = _crawl(config, site, store, since=datetime.now(timezone.utc) - timedelta(days=7))
+        assert len(items) == site.per_page
+        assert len(site.detail_calls()) == site.per_page
+    finally:
+        store.close()
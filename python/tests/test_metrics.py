@@ -0,0 +1,26 @@
+import json
+import threading
+
+from licitor.metrics import Metrics
+
+
+def test_concurrent_reports_do_not_clobber_each_other(tmp_path):
+    path = str(tmp_path / "run_report.json")
+    errors = []
+
+    def write(n):
+        try:
+            for _ in range(50):
+                Metrics().write_report(path, records={"writer": n})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["records"]["writer"] in range(4)
+    assert [p.name for p in tmp_path.iterdir()] == ["run_report.json"]
@@ -0,0 +1,24 @@
+from licitor.crawler import Crawler
+from licitor.extract import parse_detail
+
+
+def _records(config, site, parse_workers):
+    with Crawler(config.with_options(parse_workers=parse_workers), client=site) as crawler:
+        return list(crawler.iter_records(scraped_at="2025-09-01T00:00:00+00:00"))
+
+
+def test_process_pool_gives_same_records_in_card_order(config, site):
+    threaded = _records(config, site, 0)
+    pooled = _records(config, site, 2)
+    assert pooled == threaded
+    numbers = [n for page in (1, 2) for n in site.numbers("paris-et-ile-de-france", page)]
+    assert [it["Number"] for it in pooled] == [str(n) for n in numbers]
+    assert pooled[0]["adresse"] == f"{numbers[0] % 90 + 1}, rue de Rivoli"
+    assert pooled[0]["date_vente"]
+
+
+def test_parse_detail_reports_timings_and_failures(site):
+    fields = parse_detail(site.detail(100001), "https://www.licitor.com/annonce/x/100001.html")
+    assert fields["extras"]["Number"] == "100001"
+    assert fields["failures"] == []
+    assert fields["timings"]
@@ -0,0 +1,42 @@
+import io
+import os
+
+import pytest
+
+from licitor.photos import PhotoPipeline
+
+Image = pytest.importorskip("PIL.Image")
+
+
+class _Photo:
+    def __init__(self, body: bytes):
+        self.status_code = 200
+        self.headers = {"ETag": '"v1"'}
+        self._body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, size):
+        yield self._body
+
+
+def test_thumbnail_is_written_under_public_with_web_path(tmp_path):
+    buf = io.BytesIO()
+    Image.new("RGB", (1200, 800), (120, 80, 40)).save(buf, "JPEG")
+    public_thumbs = tmp_path / "public" / "thumbs"
+    pipeline = PhotoPipeline(str(tmp_path / "Pictures"), lambda url, cond: _Photo(buf.getvalue()), workers=1,
+                             thumb_width=64, thumbs_dir=str(public_thumbs), thumbs_url="/thumbs")
+    try:
+        local, thumb = pipeline.submit("https://img.licitor.com/p/100001.jpg").result()
+    finally:
+        pipeline.close()
+    assert local == str(tmp_path / "Pictures" / "100001.jpg")
+    assert thumb.startswith("/thumbs/") and thumb.endswith(".webp")
+    assert os.path.exists(public_thumbs / os.path.basename(thumb))
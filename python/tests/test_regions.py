@@ -0,0 +1,57 @@
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from licitor.crawler import Crawler
+
+REGIONS = ["bretagne", "normandie", "aquitaine"]
+
+
+def _crawler(config, site, stop):
+    return Crawler(config.with_options(regions=REGIONS, pages=3), client=site, stop=stop)
+
+
+def test_all_regions_are_crawled(config, site):
+    stop = threading.Event()
+    with _crawler(config, site, stop) as crawler:
+        items = list(crawler.iter_regions())
+    assert sorted({it["region"] for it in items}) == sorted(REGIONS)
+    assert len(items) == len(REGIONS) * 3 * site.per_page
+    assert crawler.completed_pages == {name: 3 for name in REGIONS}
+    assert not crawler.interrupted
+
+
+def test_failed_region_does_not_set_caller_stop(config, site):
+    stop = threading.Event()
+    failing = {f"NUM:{n}" for n in site.numbers("normandie", 1)}
+
+    def lookup(key):
+        if key in failing:
+            raise RuntimeError("base indisponible")
+        return None
+
+    with _crawler(config, site, stop) as crawler:
+        with pytest.raises(RuntimeError, match="base indisponible"):
+            list(crawler.iter_regions(lookup=lookup, since=datetime.now(timezone.utc)))
+    # L'arrêt du démon appartient au démon: il doit pouvoir relancer un run après retry_delay
+    assert not stop.is_set()
+
+
+def test_consumer_stop_does_not_set_caller_stop(config, site):
+    stop = threading.Event()
+    with _crawler(config, site, stop) as crawler:
+        records = crawler.iter_regions()
+        next(records)
+        records.close()
+    assert not stop.is_set()
+    assert crawler.interrupted
+
+
+def test_caller_stop_interrupts_every_region(config, site):
+    stop = threading.Event()
+    stop.set()
+    with _crawler(config, site, stop) as crawler:
+        assert list(crawler.iter_regions()) == []
+    assert crawler.interrupted
+    assert site.calls == []
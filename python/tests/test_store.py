@@ -0,0 +1,46 @@
+from licitor.crawler import _key_for, _merge_record
+from licitor.store import ListingStore
+
+
+def _listing(**fields):
+    item = {
+        "Number": "101", "lien": "https://www.licitor.com/annonce/101.html", "ville": "Paris 6ème",
+        "mise_a_prix": "100 000 €", "date_vente": "jeudi 9 octobre 2025", "adresse": "12, rue de Rennes",
+        "texte": "Un appartement", "scraped_at": "2025-09-01T00:00:00+00:00", "card_fingerprint": "a",
+    }
+    item.update(fields)
+    return item
+
+
+def test_upsert_tracks_price_and_date_changes(tmp_path):
+    store = ListingStore(str(tmp_path / "listings.db"), _key_for)
+    try:
+        assert store.upsert_many([_listing()], _merge_record, "2025-09-01T00:00:00+00:00") == {
+            "inserted": 1, "updated": 0, "unchanged": 0}
+        stats = store.upsert_many(
+            [_listing(mise_a_prix="80 000 €", date_vente="jeudi 16 octobre 2025", card_fingerprint="b",
+                      scraped_at="2025-09-08T00:00:00+00:00")],
+            _merge_record, "2025-09-08T00:00:00+00:00",
+        )
+        assert stats["updated"] == 1
+        assert store.get("NUM:101")["mise_a_prix"] == "80 000 €"
+        assert store.query(prix_max=90000) == [store.get("NUM:101")]
+        history = store.history("NUM:101")
+        assert [(h["prix"], h["vente_iso"]) for h in history] == [(100000, "2025-10-09"), (80000, "2025-10-16")]
+    finally:
+        store.close()
+
+
+def test_upsert_keeps_fields_missing_from_new_crawl(tmp_path):
+    store = ListingStore(str(tmp_path / "listings.db"), _key_for)
+    try:
+        store.upsert_many([_listing()], _merge_record)
+        # Page détail en échec: adresse et date absentes du nouveau passage
+        stats = store.upsert_many([_listing(adresse="", date_vente="")], _merge_record)
+        assert stats["unchanged"] == 1
+        stored = store.get("NUM:101")
+        assert stored["adresse"] == "12, rue de Rennes"
+        assert stored["date_vente"] == "jeudi 9 octobre 2025"
+        assert len(store.history("NUM:101")) == 1
+    finally:
+        store.close()
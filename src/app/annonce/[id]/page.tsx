@@ -132,11 +132,30 @@ export default function AnnonceDetail() {
   const scrollRight = () => scrollByPage(1);
 
   useEffect(() => {
-    fetch("/licitor_samples.json")
-      .then(res => res.json())
-      .then((data: Annonce[]) => {
-        const withIds = data.map((a, idx) => ({ ...a, id: idx }));
-    const found = withIds.find(a => String(a.id) === String(paramId));
+    // Index léger (id -> fichier détail) puis fiche de l'annonce seule;
+    // repli sur le jeu complet si les fichiers découpés n'existent pas encore
+    const loadFull = () =>
+      fetch("/licitor_samples.json")
+        .then(res => res.json())
+        .then((data: Annonce[]) => {
+          const withIds = data.map((a, idx) => ({ ...a, id: idx }));
+          return withIds.find(a => String(a.id) === String(paramId)) ?? null;
+        });
+    fetch("/licitor/index.json")
+      .then(res => {
+        if (!res.ok) throw new Error("index absent");
+        return res.json() as Promise<{ id: number; detail: string }[]>;
+      })
+      .then(index => {
+        const entry = index.find(e => String(e.id) === String(paramId));
+        if (!entry) return null;
+        return fetch(`/licitor/${entry.detail}`).then(res => {
+          if (!res.ok) throw new Error("fiche absente");
+          return res.json() as Promise<Annonce>;
+        });
+      })
+      .catch(loadFull)
+      .then(found => {
         setAnnonce(found ?? null);
         setLoading(false);
       })
@@ -15,6 +15,7 @@ type Annonce = {
   texte: string;
   mise_a_prix: string;
   photo: string;
+  photo_thumb?: string; // miniature WebP générée par le scraper, servie depuis public/ ("/thumbs/<empreinte>.webp")
   date_visite: string;
   date_vente: string;
   adresse: string;
@@ -24,6 +25,11 @@ type Annonce = {
   pitch?: number;
   fov?: number;
   FirstSousLot?: string;
+  // Champs normalisés par le scraper (licitor.features); absents des anciens jeux de données
+  prix?: number | null;
+  vente_iso?: string;
+  surface_m2?: number | null;
+  occupation?: string;
 };
 
 // Formatteur "Visite" pour la page d'accueil: retour "jour date à HH:MM"
@@ -184,6 +190,15 @@ function parseVenteDate(dateStr?: string): Date | null {
   return null;
 }
 
+// Date de vente normalisée (AAAA-MM-JJ) si disponible, sinon analyse du texte
+function venteDateOf(a: Annonce): Date | null {
+  return a.vente_iso ? new Date(a.vente_iso) : parseVenteDate(a.date_vente);
+}
+
+function prixOf(a: Annonce): number {
+  return typeof a.prix === "number" ? a.prix : prixToNumber(a.mise_a_prix);
+}
+
 function prixToNumber(p: string): number {
   const n = parseInt((p || "").toString().replace(/[^\d]/g, ""), 10);
   return isNaN(n) ? Number.MAX_SAFE_INTEGER : n;
@@ -202,12 +217,19 @@ function prixToNumber(p: string): number {
   const [showFavsOnly, setShowFavsOnly] = useState(false);
 
   useEffect(() => {
-    fetch("/licitor_samples.json")
-      .then(res => res.json())
-      .then((data: Annonce[]) => {
-        const withIds = data.map((a, idx) => ({ ...a, id: idx }));
-        setAnnonces(withIds);
-      });
+    // Index léger généré par le scraper (champs des cartes uniquement, id déjà renseigné);
+    // repli sur le jeu complet si l'index n'a pas encore été généré
+    fetch("/licitor/index.json")
+      .then(res => {
+        if (!res.ok) throw new Error("index absent");
+        return res.json() as Promise<Annonce[]>;
+      })
+      .catch(() =>
+        fetch("/licitor_samples.json")
+          .then(res => res.json())
+          .then((data: Annonce[]) => data.map((a, idx) => ({ ...a, id: idx })))
+      )
+      .then((data: Annonce[]) => setAnnonces(data));
   }, []);
 
   // Charger favoris de la session (cookie via API)
@@ -236,8 +258,8 @@ function prixToNumber(p: string): number {
   const filtered = annonces.filter(a =>
     (ville ? a.ville === ville : true) &&
     (search ? removeAccents(a.ville.toLowerCase()).includes(removeAccents(search.toLowerCase())) : true) &&
-    (minPrix ? parseInt(a.mise_a_prix.replace(/[^\d]/g, "")) >= parseInt(minPrix) : true) &&
-    (maxPrix ? parseInt(a.mise_a_prix.replace(/[^\d]/g, "")) <= parseInt(maxPrix) : true) &&
+    (minPrix ? prixOf(a) >= parseInt(minPrix) : true) &&
+    (maxPrix ? prixOf(a) <= parseInt(maxPrix) : true) &&
     (showFavsOnly ? favorites.includes(a.id ?? -1) : true) &&
     // Masquer les ventes passées
     isVenteFuture(a.date_vente)
@@ -245,8 +267,8 @@ function prixToNumber(p: string): number {
 
   // Tri pertinent: d'abord par date de vente la plus proche, puis prix croissant pour éviter d'afficher d'emblée des montants très élevés
   const sorted = [...filtered].sort((a, b) => {
-    const da = parseVenteDate(a.date_vente);
-    const db = parseVenteDate(b.date_vente);
+    const da = venteDateOf(a);
+    const db = venteDateOf(b);
     if (da && db) {
       const cmp = da.getTime() - db.getTime();
       if (cmp !== 0) return cmp;
@@ -256,7 +278,7 @@ function prixToNumber(p: string): number {
       return 1;
     }
     // Ensuite trier par prix croissant
-    return prixToNumber(a.mise_a_prix) - prixToNumber(b.mise_a_prix);
+    return prixOf(a) - prixOf(b);
   });
 
   const totalPages = Math.ceil(sorted.length / perPage);
@@ -409,7 +431,7 @@ function prixToNumber(p: string): number {
 >
           <div className="w-full h-48 md:w-56 md:h-auto flex-shrink-0 bg-gradient-to-br from-secondary/60 via-white/40 to-orange-100/40 flex items-center justify-center relative transition-all duration-300 rounded-t-3xl md:rounded-l-3xl md:rounded-tr-none overflow-hidden">
             {a.photo ? (
-              <img src={a.photo.replace(/\\/g, "/")} alt="photo" className="w-full h-full object-cover group-hover:brightness-110 group-hover:scale-105 transition-transform duration-300 rounded-t-3xl md:rounded-none md:rounded-l-3xl shadow-lg" />
+              <img src={(a.photo_thumb?.startsWith("/thumbs/") ? a.photo_thumb : a.photo).replace(/\\/g, "/")} alt="photo" className="w-full h-full object-cover group-hover:brightness-110 group-hover:scale-105 transition-transform duration-300 rounded-t-3xl md:rounded-none md:rounded-l-3xl shadow-lg" />
             ) : ( (() => {
                 const lat = Number(a.latitude);
                 const lon = Number(a.longitude);